@@ -0,0 +1,109 @@
+"""Local load test for the inventory JSON API.
+
+Starts the API in-process on a free port against a store seeded with
+``--items`` items, then runs ``--clients`` keep-alive connections that
+each send ``--requests`` requests (paged lists, single-item reads and
+batch receive/assign operations). Reports requests per second.
+
+    python benchmarks/api_load.py --clients 32 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_api import start_api_thread  # noqa: E402
+from inventory_core import InventoryStore  # noqa: E402
+
+
+def seeded_store(count: int) -> InventoryStore:
+    store = InventoryStore()
+    store.upsert_items({
+        "id": f"item_{n}",
+        "itemName": f"Item {n}",
+        "requested": 4,
+        "custodian": f"Custodian {n % 50}",
+        "location": f"Location {n % 10}",
+    } for n in range(1, count + 1))
+    return store
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def call(reader, writer, method: str, path: str, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port: int, client_id: int, requests: int, items: int, errors: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for n in range(requests):
+        key = f"item_{(client_id * requests + n) % items + 1}"
+        kind = n % 4
+        if kind == 0:
+            status = await call(reader, writer, "GET", f"/items?status=missing&offset={n % items}&limit=50")
+        elif kind == 1:
+            status = await call(reader, writer, "GET", f"/items/{key}")
+        else:
+            # Rule violations (409) are expected once items move on
+            status = await call(reader, writer, "POST", "/batch", {"operations": [
+                {"op": "receive", "id": key, "received": 4},
+                {"op": "assign", "id": key},
+            ]})
+        if status >= 500 or status == 404:
+            errors.append(status)
+    writer.close()
+
+
+async def run_load(port: int, clients: int, requests: int, items: int):
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, n, requests, items, errors) for n in range(clients)))
+    return time.perf_counter() - start, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    port = free_port()
+    start_api_thread(seeded_store(args.items), "127.0.0.1", port)
+    elapsed, errors = asyncio.run(run_load(port, args.clients, args.requests, args.items))
+    total = args.clients * args.requests
+    print(f"{total} requests over {args.clients} keep-alive connections in {elapsed:.2f} s")
+    print(f"throughput: {total / elapsed:.0f} req/s")
+    if errors:
+        print(f"FAIL: {len(errors)} unexpected responses")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
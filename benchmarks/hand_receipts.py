@@ -0,0 +1,70 @@
+"""Hand receipt generation benchmark.
+
+Builds receipts for ``--custodians`` custodians holding ``--items`` items
+each, then asks again for the same dataset version to confirm the cached
+zip is returned. Exits non-zero if the cold run exceeds its budget.
+
+    python benchmarks/hand_receipts.py --custodians 1000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hand_receipts import build_hand_receipts  # noqa: E402
+
+
+def sample_items(custodians: int, per_custodian: int):
+    items = {}
+    for c in range(custodians):
+        for n in range(per_custodian):
+            items[f"item_{c}_{n}"] = {
+                "itemName": f"Item {n}",
+                "requested": 3,
+                "received": 2,
+                "missing": 1,
+                "custodian": f"Custodian {c}",
+                "location": f"Location {c % 20}",
+                "email": f"custodian{c}@example.com",
+                "expendable": n % 2 == 0,
+                "verified": True,
+                "returned": False,
+            }
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--custodians", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--budget-s", type=float, default=5.0)
+    args = parser.parse_args()
+
+    items = sample_items(args.custodians, args.items)
+    updates = []
+    start = time.perf_counter()
+    data = build_hand_receipts(items, "Benchmark Event", 1, progress=lambda done, total: updates.append(done))
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_hand_receipts(items, "Benchmark Event", 1)
+    cached = time.perf_counter() - start
+
+    receipts = len(zipfile.ZipFile(io.BytesIO(data)).namelist())
+    print(f"{receipts} receipts ({len(data) / 1024:.0f} KiB zip) in {cold:.2f} s, "
+          f"{len(updates)} progress updates; cached: {cached * 1000:.2f} ms")
+    if receipts != args.custodians:
+        print(f"FAIL: expected {args.custodians} receipts")
+        return 1
+    if cold > args.budget_s:
+        print(f"FAIL: cold run exceeds {args.budget_s} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
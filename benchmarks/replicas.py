@@ -0,0 +1,158 @@
+"""Multi-replica harness for the shared inventory store.
+
+Runs entirely on one Linux box: starts the change feed broker and
+``--replicas`` API processes that share one SQLite database, then checks
+that
+
+  * a change made on one replica becomes visible on every other one
+    (and reports how long that takes),
+  * status rules hold across replicas: of two concurrent conflicting
+    assigns, exactly one succeeds,
+  * replicas allocating new keys at the same time never collide,
+  * replicas catch up after the broker restarts.
+
+    python benchmarks/replicas.py --replicas 4
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROPAGATION_TIMEOUT = 5.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def call(port: int, method: str, path: str, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+
+def wait_until(check, timeout: float = PROPAGATION_TIMEOUT) -> float:
+    """Seconds until ``check()`` is true; raises if it never is"""
+    start = time.perf_counter()
+    while not check():
+        if time.perf_counter() - start > timeout:
+            raise AssertionError("replicas did not converge")
+        time.sleep(0.005)
+    return time.perf_counter() - start
+
+
+def start_broker(feed_path: str) -> subprocess.Popen:
+    broker = subprocess.Popen(
+        [sys.executable, "inventory_sync.py", "broker", "--socket", feed_path],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    wait_until(lambda: os.path.exists(feed_path))
+    return broker
+
+
+def start_replica(port: int, db_path: str, feed_path: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "inventory_api.py", "--port", str(port), "--db", db_path, "--feed", feed_path],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+
+
+def is_up(port: int) -> bool:
+    try:
+        return call(port, "GET", "/items?limit=1")[0] == 200
+    except OSError:
+        return False
+
+
+def check_propagation(ports):
+    latencies = []
+    for n, port in enumerate(ports):
+        key = f"harness_{n}"
+        call(port, "POST", "/items", {"items": [{"id": key, "itemName": f"Harness {n}", "requested": 2}]})
+        for other in ports:
+            if other != port:
+                latencies.append(wait_until(lambda: call(other, "GET", f"/items/{key}")[0] == 200))
+        call(port, "POST", f"/items/{key}/receive", {"received": 2})
+        for other in ports:
+            wait_until(lambda: call(other, "GET", f"/items/{key}")[1].get("received") == 2)
+    return latencies
+
+
+def check_conflicts(ports):
+    call(ports[0], "POST", "/items", {"items": [{"id": "contested", "itemName": "Contested", "requested": 1, "received": 1}]})
+    with ThreadPoolExecutor(len(ports)) as pool:
+        statuses = list(pool.map(lambda port: call(port, "POST", "/items/contested/assign")[0], ports))
+    assert statuses.count(200) == 1, f"expected exactly one successful assign, got {statuses}"
+    assert all(status in (200, 409) for status in statuses), statuses
+
+
+def check_key_allocation(ports, per_replica: int = 20):
+    def add_items(port):
+        return call(port, "POST", "/items", {"items": [{"itemName": "Bulk", "requested": 1}] * per_replica})[1]["ids"]
+
+    with ThreadPoolExecutor(len(ports)) as pool:
+        ids = [key for keys in pool.map(add_items, ports) for key in keys]
+    assert len(set(ids)) == len(ids) == per_replica * len(ports), "replicas allocated duplicate keys"
+
+
+def check_broker_restart(ports, broker, feed_path):
+    broker.terminate()
+    broker.wait()
+    call(ports[0], "POST", "/items", {"items": [{"id": "offline_change", "itemName": "Offline", "requested": 1}]})
+    broker = start_broker(feed_path)
+    for port in ports[1:]:
+        wait_until(lambda: call(port, "GET", "/items/offline_change")[0] == 200, timeout=10)
+    return broker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="inventory-replicas-")
+    db_path = os.path.join(workdir, "inventory.db")
+    feed_path = os.path.join(workdir, "feed.sock")
+    broker = start_broker(feed_path)
+    ports = [free_port() for _ in range(args.replicas)]
+    replicas = [start_replica(port, db_path, feed_path) for port in ports]
+    try:
+        for port in ports:
+            wait_until(lambda: is_up(port), timeout=15)
+
+        latencies = check_propagation(ports)
+        print(f"propagation over {len(latencies)} reads: "
+              f"median {statistics.median(latencies) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+        check_conflicts(ports)
+        print("conflicting assigns: exactly one succeeded")
+        check_key_allocation(ports)
+        print("concurrent key allocation: no duplicates")
+        broker = check_broker_restart(ports, broker, feed_path)
+        print("broker restart: replicas caught up")
+    except AssertionError as error:
+        print(f"FAIL: {error}")
+        return 1
+    finally:
+        for process in replicas + [broker]:
+            process.terminate()
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
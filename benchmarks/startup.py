@@ -0,0 +1,100 @@
+"""Startup benchmark for the Streamlit app.
+
+Measures, each in a fresh interpreter:
+  * import time of the app module via ``python -X importtime``
+  * time to first paint: one full script run for a new session
+
+Exits non-zero if a measurement exceeds its budget or if pandas is pulled
+in before the first paint, so it can be used as a regression guard:
+
+    python benchmarks/startup.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "streamlit_app.py")
+
+FIRST_PAINT_SNIPPET = f"""
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({APP!r}, default_timeout=60)
+at.run()
+elapsed = time.perf_counter() - start
+import sys
+assert not at.exception, at.exception
+print(elapsed, "pandas" in sys.modules)
+"""
+
+
+def measure_import_time():
+    """Cumulative import time of the app module in milliseconds, and the imported modules"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import streamlit_app"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not parts[1].isdigit():
+            continue
+        name = parts[2]
+        modules.add(name.strip())
+        if name == "streamlit_app":
+            total_us = int(parts[1])
+    return total_us / 1000, modules
+
+
+def measure_first_paint():
+    """Seconds for a fresh session's first script run, and whether pandas was loaded"""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_SNIPPET],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    elapsed, pandas_loaded = result.stdout.split()[-2:]
+    return float(elapsed), pandas_loaded == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0)
+    parser.add_argument("--paint-budget-s", type=float, default=3.0)
+    args = parser.parse_args()
+
+    import_times = []
+    paint_times = []
+    failures = []
+    for _ in range(args.runs):
+        import_ms, modules = measure_import_time()
+        import_times.append(import_ms)
+        if "pandas" in modules:
+            failures.append("pandas is imported at module load")
+        paint_s, pandas_loaded = measure_first_paint()
+        paint_times.append(paint_s)
+        if pandas_loaded:
+            failures.append("pandas is loaded before first paint")
+
+    import_ms = statistics.median(import_times)
+    paint_s = statistics.median(paint_times)
+    print(f"import time (median of {args.runs}): {import_ms:.1f} ms")
+    print(f"first paint (median of {args.runs}): {paint_s:.3f} s")
+
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import time {import_ms:.1f} ms exceeds {args.import_budget_ms} ms")
+    if paint_s > args.paint_budget_s:
+        failures.append(f"first paint {paint_s:.3f} s exceeds {args.paint_budget_s} s")
+    for failure in sorted(set(failures)):
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Memory overhead of keeping inventory versions.
+
+Applies ``--mutations`` single-item changes to a store of ``--items``
+items and measures, with tracemalloc, how much memory the retained
+versions (timeline, undo steps and replaced items) cost per mutation.
+Compares that with keeping a deep copy of the inventory per version.
+
+    python benchmarks/versions_memory.py --items 1000 --mutations 10000
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_core import InventoryStore  # noqa: E402
+
+
+def seeded_store(count: int) -> InventoryStore:
+    store = InventoryStore()
+    store.upsert_items({
+        "id": f"item_{n}",
+        "itemName": f"Item {n}",
+        "requested": 4,
+        "custodian": f"Custodian {n % 50}",
+        "location": f"Location {n % 10}",
+        "email": f"custodian{n % 50}@example.com",
+    } for n in range(count))
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--mutations", type=int, default=10_000)
+    parser.add_argument("--budget-bytes", type=int, default=4096,
+                        help="maximum retained bytes per mutation")
+    args = parser.parse_args()
+
+    rng = random.Random(72)
+    store = seeded_store(args.items)
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    deep_copy = copy.deepcopy(store.items)
+    deep_copy_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    del deep_copy
+
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    for n in range(args.mutations):
+        store.upsert_items([{"id": f"item_{rng.randrange(args.items)}", "onHand": n}])
+    elapsed = time.perf_counter() - start
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_mutation = (after - before) / args.mutations
+    print(f"{args.mutations} mutations over {args.items} items in {elapsed:.2f} s "
+          f"({elapsed / args.mutations * 1e6:.1f} us each)")
+    print(f"versions retained: {len(store.timeline)}, undo steps: {len(store.undo_stack)}")
+    print(f"retained memory: {(after - before) / 1024 / 1024:.1f} MiB, {per_mutation:.0f} bytes per mutation")
+    print(f"a deep copy per version would cost {deep_copy_bytes:.0f} bytes per mutation "
+          f"({deep_copy_bytes / max(per_mutation, 1):.0f}x more)")
+    if per_mutation > args.budget_bytes:
+        print(f"FAIL: {per_mutation:.0f} bytes per mutation exceeds {args.budget_bytes}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
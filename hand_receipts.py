@@ -0,0 +1,186 @@
+"""Per-custodian hand receipts for closing out an event.
+
+Inventory is grouped by custodian in one pass, each custodian's receipt is
+rendered to a printable HTML page in a process pool, and the pages are
+packaged into a single zip. Finished zips are cached by dataset version,
+so asking again without any inventory change returns immediately.
+"""
+import html
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from inventory_core import get_item_status, group_value
+
+# Below this many custodians rendering inline beats starting a pool
+POOL_THRESHOLD = 50
+CACHE_SIZE = 4
+
+_cache: "OrderedDict[Tuple, bytes]" = OrderedDict()
+# Sessions build receipts from their own threads
+_cache_lock = threading.Lock()
+
+RECEIPT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Hand Receipt - {custodian}</title>
+<style>
+    body {{ font-family: 'Inter', system-ui, sans-serif; margin: 2rem; color: #111; }}
+    h1 {{ font-size: 1.25rem; margin-bottom: 0.25rem; }}
+    p {{ margin: 0.25rem 0; color: #444; font-size: 0.875rem; }}
+    table {{ width: 100%; border-collapse: collapse; margin-top: 1.5rem; font-size: 0.875rem; }}
+    th, td {{ border: 1px solid #999; padding: 0.375rem 0.5rem; text-align: left; }}
+    th {{ background: #eee; }}
+    td.num {{ text-align: right; }}
+    tfoot td {{ font-weight: 700; }}
+    .signatures {{ display: flex; gap: 3rem; margin-top: 3rem; }}
+    .signature {{ flex: 1; border-top: 1px solid #111; padding-top: 0.25rem; font-size: 0.75rem; }}
+    @media print {{ body {{ margin: 0.5in; }} }}
+</style>
+</head>
+<body>
+<h1>Hand Receipt &mdash; {event_name}</h1>
+<p><strong>Custodian:</strong> {custodian}</p>
+<p><strong>Contact:</strong> {contact}</p>
+<p><strong>Generated:</strong> {generated}</p>
+<table>
+<thead>
+<tr><th>Item</th><th>Location</th><th>Type</th><th>Status</th><th>Requested</th><th>Received</th><th>Missing</th></tr>
+</thead>
+<tbody>
+{rows}
+</tbody>
+<tfoot>
+<tr><td colspan="4">Total ({count} line items)</td><td class="num">{requested}</td><td class="num">{received}</td><td class="num">{missing}</td></tr>
+</tfoot>
+</table>
+<div class="signatures">
+<div class="signature">Custodian signature / date</div>
+<div class="signature">Supply officer signature / date</div>
+</div>
+</body>
+</html>
+"""
+
+ROW_TEMPLATE = (
+    "<tr><td>{name}</td><td>{location}</td><td>{type}</td><td>{status}</td>"
+    "<td class=\"num\">{requested}</td><td class=\"num\">{received}</td><td class=\"num\">{missing}</td></tr>"
+)
+
+
+def group_by_custodian(items: Dict[str, Dict]) -> Dict[str, List[Dict]]:
+    """Custodian name to that custodian's items, in one pass"""
+    groups: Dict[str, List[Dict]] = {}
+    for item in items.values():
+        groups.setdefault(group_value("custodian", item), []).append(item)
+    return groups
+
+
+def render_receipt(custodian: str, items: List[Dict], event_name: str, generated: str) -> str:
+    """HTML hand receipt for one custodian"""
+    esc = html.escape
+    rows = []
+    totals = {"requested": 0, "received": 0, "missing": 0}
+    contacts = []
+    for item in sorted(items, key=lambda item: item.get("itemName", "")):
+        for field in totals:
+            totals[field] += item.get(field, 0)
+        for contact in (item.get("email"), item.get("phone")):
+            if contact and contact not in contacts:
+                contacts.append(contact)
+        rows.append(ROW_TEMPLATE.format(
+            name=esc(item.get("itemName", "")),
+            location=esc(item.get("location", "")),
+            type="Expendable" if item.get("expendable", False) else "Non-Expendable",
+            status=get_item_status(item).title(),
+            requested=item.get("requested", 0),
+            received=item.get("received", 0),
+            missing=item.get("missing", 0),
+        ))
+    return RECEIPT_TEMPLATE.format(
+        event_name=esc(event_name),
+        custodian=esc(custodian),
+        contact=esc(", ".join(contacts)) or "&mdash;",
+        generated=esc(generated),
+        rows="\n".join(rows),
+        count=len(items),
+        **totals
+    )
+
+
+def render_batch(batch: List[Tuple[str, List[Dict]]], event_name: str, generated: str) -> List[Tuple[str, str]]:
+    """Pool task: render a batch of custodians to (custodian, html) pairs"""
+    return [(custodian, render_receipt(custodian, items, event_name, generated)) for custodian, items in batch]
+
+
+def receipt_filename(custodian: str, taken: set) -> str:
+    base = re.sub(r"[^A-Za-z0-9]+", "_", custodian).strip("_") or "custodian"
+    name = f"{base}.html"
+    n = 2
+    while name in taken:
+        name = f"{base}_{n}.html"
+        n += 1
+    taken.add(name)
+    return name
+
+
+def build_hand_receipts(items: Dict[str, Dict], event_name: str, version: int,
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        workers: Optional[int] = None) -> bytes:
+    """Zip of one HTML hand receipt per custodian.
+
+    ``progress(done, total)`` is called as custodians finish. Output is
+    cached by (version, event_name); pass the store's version so any
+    inventory change produces a fresh zip.
+    """
+    cache_key = (version, event_name)
+    with _cache_lock:
+        if cache_key in _cache:
+            _cache.move_to_end(cache_key)
+            return _cache[cache_key]
+
+    groups = sorted(group_by_custodian(items).items())
+    total = len(groups)
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+    rendered: List[Tuple[str, str]] = []
+
+    if total < POOL_THRESHOLD:
+        for custodian, custodian_items in groups:
+            rendered.append((custodian, render_receipt(custodian, custodian_items, event_name, generated)))
+            if progress:
+                progress(len(rendered), total)
+    else:
+        workers = workers or os.cpu_count() or 1
+        # A few batches per worker keeps progress moving without per-custodian IPC
+        size = max(1, total // (workers * 4))
+        batches = [groups[start:start + size] for start in range(0, total, size)]
+        # Forking the multi-threaded server could copy locks held by other
+        # threads; forkserver workers only import this module
+        context = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(render_batch, batch, event_name, generated) for batch in batches]
+            for future in as_completed(futures):
+                rendered.extend(future.result())
+                if progress:
+                    progress(len(rendered), total)
+
+    buffer = io.BytesIO()
+    taken: set = set()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for custodian, page in sorted(rendered):
+            archive.writestr(receipt_filename(custodian, taken), page)
+    data = buffer.getvalue()
+
+    with _cache_lock:
+        _cache[cache_key] = data
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return data
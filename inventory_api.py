@@ -0,0 +1,255 @@
+"""Headless JSON API over the shared InventoryStore.
+
+A small HTTP/1.1 server on asyncio streams with keep-alive, so scanners,
+the React client and scripts can change inventory without driving the
+Streamlit UI. Every change goes through InventoryStore, which applies the
+same status rules as the admin actions.
+
+Routes:
+    GET  /items?status=&offset=&limit=   list items, optionally by status
+    GET  /items/<id>                     one item
+    POST /items                          bulk upsert: {"items": [{...}, ...]}
+    POST /items/<id>/receive             {"received": n}
+    POST /items/<id>/assign              {"dueDate": ms}  (optional)
+    POST /items/<id>/return
+    POST /items/<id>/missing             {"returned": n}
+    DELETE /items/<id>
+    GET  /requests                       pending requests
+    POST /requests                       submit a request
+    POST /requests/<id>/approve
+    POST /requests/<id>/deny
+    POST /batch                          {"operations": [{"op": ..., "id": ..., ...}]}
+
+Run standalone with ``python inventory_api.py --port 8600`` (add ``--db``
+and ``--feed`` to serve as a replica, see inventory_sync) or inside the
+Streamlit process by setting INVENTORY_API_PORT. When INVENTORY_API_TOKEN
+is set, requests must send ``Authorization: Bearer <token>``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from inventory_core import SAMPLE_INVENTORY, InvalidFieldError, InventoryError, InventoryStore
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+DEFAULT_PAGE_SIZE = 100
+logger = logging.getLogger(__name__)
+LIST_STATUSES = ("missing", "received", "assigned", "returned", "overdue")
+
+# Operations accepted by /batch and the per-item POST routes
+ITEM_ACTIONS = {
+    "receive": lambda store, key, body: store.receive(key, body.get("received")),
+    "assign": lambda store, key, body: store.assign(key, body.get("dueDate")),
+    "return": lambda store, key, body: store.mark_returned(key),
+    "missing": lambda store, key, body: store.record_missing(key, body.get("returned")),
+}
+REQUEST_ACTIONS = {
+    "approve": lambda store, key, body: {"itemId": store.approve_request(key)},
+    "deny": lambda store, key, body: store.deny_request(key),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def item_json(key: str, item: Dict) -> Dict:
+    return {"id": key, **item}
+
+
+class InventoryApi:
+    """Routes HTTP requests to InventoryStore calls"""
+
+    def __init__(self, store: InventoryStore, token: Optional[str] = None):
+        self.store = store
+        self.token = token
+
+    def dispatch(self, method: str, target: str, headers: Dict, body: bytes) -> Tuple[HTTPStatus, object]:
+        try:
+            if self.token and headers.get("authorization") != f"Bearer {self.token}":
+                raise ApiError(HTTPStatus.UNAUTHORIZED, "Missing or invalid token")
+            url = urlsplit(target)
+            parts = [part for part in url.path.split("/") if part]
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+            return self.route(method, parts, parse_qs(url.query), payload)
+        except ApiError as error:
+            return error.status, {"error": str(error)}
+        except InvalidFieldError as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        except InventoryError as error:
+            return HTTPStatus.CONFLICT, {"error": str(error)}
+        except KeyError as error:
+            return HTTPStatus.NOT_FOUND, {"error": f"Not found: {error.args[0]}"}
+        except (ValueError, TypeError) as error:
+            return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+
+    def route(self, method: str, parts, query: Dict, payload) -> Tuple[HTTPStatus, object]:
+        store = self.store
+        if parts == ["items"]:
+            if method == "GET":
+                offset = int(query.get("offset", ["0"])[0])
+                limit = int(query.get("limit", [str(DEFAULT_PAGE_SIZE)])[0])
+                status = query.get("status", [None])[0]
+                if offset < 0 or limit < 0:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "offset and limit must be non-negative")
+                if status is not None and status not in LIST_STATUSES:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, f"Unknown status: {status}")
+                total, page = store.list_items(status, offset, limit)
+                return HTTPStatus.OK, {
+                    "total": total,
+                    "offset": offset,
+                    "limit": limit,
+                    "items": [item_json(key, item) for key, item in page]
+                }
+            if method == "POST":
+                items = payload.get("items", [])
+                if not isinstance(items, list):
+                    raise ApiError(HTTPStatus.BAD_REQUEST, "items must be a list")
+                keys = store.upsert_items(items)
+                return HTTPStatus.OK, {"ids": keys}
+        elif len(parts) == 2 and parts[0] == "items":
+            if method == "GET":
+                return HTTPStatus.OK, item_json(parts[1], store.get_item(parts[1]))
+            if method == "DELETE":
+                store.delete_item(parts[1])
+                return HTTPStatus.OK, {"id": parts[1]}
+        elif len(parts) == 3 and parts[0] == "items" and method == "POST":
+            action = ITEM_ACTIONS.get(parts[2])
+            if action:
+                return HTTPStatus.OK, item_json(parts[1], action(store, parts[1], payload))
+        elif parts == ["requests"]:
+            if method == "GET":
+                requests = store.pending_requests()
+                return HTTPStatus.OK, {"requests": [item_json(key, request) for key, request in requests.items()]}
+            if method == "POST":
+                return HTTPStatus.CREATED, {"id": store.submit_request(payload)}
+        elif len(parts) == 3 and parts[0] == "requests" and method == "POST":
+            action = REQUEST_ACTIONS.get(parts[2])
+            if action:
+                return HTTPStatus.OK, action(store, parts[1], payload) or {"id": parts[1]}
+        elif parts == ["batch"] and method == "POST":
+            operations = payload.get("operations", [])
+            if not isinstance(operations, list):
+                raise ApiError(HTTPStatus.BAD_REQUEST, "operations must be a list")
+            return HTTPStatus.OK, {"results": [self.run_operation(op) for op in operations]}
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {method} /{'/'.join(parts)}")
+
+    def run_operation(self, operation: Dict) -> Dict:
+        """One /batch entry; failures are reported per operation"""
+        if not isinstance(operation, dict):
+            return {"ok": False, "error": "Each operation must be a JSON object"}
+        op = operation.get("op")
+        key = operation.get("id")
+        try:
+            if op in ITEM_ACTIONS:
+                return {"ok": True, "result": item_json(key, ITEM_ACTIONS[op](self.store, key, operation))}
+            if op in REQUEST_ACTIONS:
+                return {"ok": True, "result": REQUEST_ACTIONS[op](self.store, key, operation) or {"id": key}}
+            return {"ok": False, "error": f"Unknown operation: {op}"}
+        except InventoryError as error:
+            return {"ok": False, "error": str(error)}
+        except KeyError as error:
+            return {"ok": False, "error": f"Not found: {error.args[0]}"}
+        except (ValueError, TypeError) as error:
+            return {"ok": False, "error": str(error)}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = self.dispatch(method, target, headers, body)
+                    except Exception:
+                        # Answer rather than drop the connection on an unexpected bug
+                        logger.exception("Unhandled error for %s %s", method, target)
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+def start_api_thread(store: InventoryStore, host: str, port: int) -> threading.Thread:
+    """Run the API on its own event loop in a daemon thread sharing ``store``"""
+    api = InventoryApi(store, os.environ.get("INVENTORY_API_TOKEN"))
+    started = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(api.serve(host, port))
+        started.set()
+        loop.run_until_complete(server.serve_forever())
+
+    thread = threading.Thread(target=run, name="inventory-api", daemon=True)
+    thread.start()
+    started.wait(timeout=5)
+    return thread
+
+
+async def run_server(host: str, port: int, db_path: Optional[str] = None, feed_path: Optional[str] = None):
+    if db_path:
+        from inventory_sync import open_replica_store
+        store = open_replica_store(db_path, feed_path, SAMPLE_INVENTORY)
+    else:
+        store = InventoryStore(SAMPLE_INVENTORY)
+    store.start_snapshots()
+    api = InventoryApi(store, os.environ.get("INVENTORY_API_TOKEN"))
+    server = await api.serve(host, port)
+    print(f"Inventory API listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--db", help="shared SQLite database for running as a replica")
+    parser.add_argument("--feed", help="change feed broker socket")
+    args = parser.parse_args()
+    asyncio.run(run_server(args.host, args.port, args.db, args.feed))
@@ -0,0 +1,959 @@
+"""Inventory rules and data structures shared by the app and its tools"""
+import bisect
+import copy
+import heapq
+import logging
+import math
+import sqlite3
+import threading
+import time as pytime
+from collections import deque
+from collections.abc import ItemsView, Mapping, ValuesView
+from contextlib import contextmanager
+from datetime import datetime, date, time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sample data matching React app structure
+SAMPLE_INVENTORY = {
+    "item1": {
+        "itemName": "Combat Helmet",
+        "requested": 5,
+        "onHand": 2,
+        "received": 3,
+        "missing": 0,
+        "custodian": "SSgt Johnson",
+        "location": "Supply Room A",
+        "email": "johnson@example.com",
+        "phone": "555-0101",
+        "expendable": False,
+        "verified": False,
+        "returned": False,
+        "timestamp": 1735862400000
+    },
+    "item2": {
+        "itemName": "Field Radio",
+        "requested": 3,
+        "onHand": 1,
+        "received": 0,
+        "missing": 3,
+        "custodian": "A1C Smith",
+        "location": "Comm Center",
+        "email": "smith@example.com",
+        "phone": "555-0102",
+        "expendable": False,
+        "verified": False,
+        "returned": False,
+        "timestamp": 1735862400000
+    },
+    "item3": {
+        "itemName": "Night Vision Goggles",
+        "requested": 2,
+        "onHand": 2,
+        "received": 2,
+        "missing": 0,
+        "custodian": "TSgt Davis",
+        "location": "Equipment Bay",
+        "email": "davis@example.com",
+        "phone": "555-0103",
+        "expendable": False,
+        "verified": True,
+        "returned": False,
+        "timestamp": 1735862400000
+    }
+}
+
+def get_item_status(item):
+    """Get item status exactly like React app"""
+    if item.get('returned', False):
+        return 'returned'
+    if item.get('verified', False):
+        return 'assigned'
+    if (item.get('received', 0) >= item.get('requested', 0)):
+        return 'received'
+    return 'missing'
+
+# Default loan period for non-expendable items when they are assigned
+DEFAULT_LOAN_DAYS = 3
+
+class ReturnDeadlineScheduler:
+    """Min-heap of return deadlines for assigned non-expendable items.
+
+    Entries are (dueDate, key) pairs. Cancelled or rescheduled entries are
+    left in the heap and skipped when popped, so every schedule/cancel is
+    O(log n) and each check only pops the deadlines that have passed.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self.overdue: Set[str] = set()
+
+    def schedule(self, key: str, due: float):
+        """Schedule (or reschedule) the return deadline for an item"""
+        if self._due.get(key) == due:
+            return
+        self._due[key] = due
+        self.overdue.discard(key)
+        heapq.heappush(self._heap, (due, key))
+
+    def cancel(self, key: str):
+        """Stop tracking an item once it is returned or deleted"""
+        self._due.pop(key, None)
+        self.overdue.discard(key)
+
+    def check(self, now: float) -> Set[str]:
+        """Move every deadline that has passed into the overdue set"""
+        while self._heap and self._heap[0][0] <= now:
+            due, key = heapq.heappop(self._heap)
+            if self._due.get(key) == due:
+                self.overdue.add(key)
+        return self.overdue
+
+    def next_due(self) -> Optional[float]:
+        """Earliest pending deadline, if any"""
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+def build_return_scheduler(items: Dict) -> ReturnDeadlineScheduler:
+    """Build a scheduler from the due dates already stored on items"""
+    scheduler = ReturnDeadlineScheduler()
+    for key, item in items.items():
+        if get_item_status(item) == 'assigned' and item.get('dueDate') is not None:
+            scheduler.schedule(key, item['dueDate'])
+    return scheduler
+
+def due_date_to_ms(due: date) -> float:
+    """Deadline is the end of the selected day"""
+    return datetime.combine(due, time.max).timestamp() * 1000
+
+def format_due_date(item) -> str:
+    if item.get('dueDate') is None:
+        return ""
+    return datetime.fromtimestamp(item['dueDate'] / 1000).strftime('%Y-%m-%d')
+
+# Snapshots are taken once per minute while the store is open
+SNAPSHOT_INTERVAL_MS = 60_000
+
+def compute_aggregates(items: Dict) -> Dict:
+    """Per-status and per-location totals for one history snapshot"""
+    status_counts = {'missing': 0, 'received': 0, 'assigned': 0, 'returned': 0}
+    location_shortfall = {}
+    totals = {'requested': 0, 'received': 0, 'missing': 0}
+    for item in items.values():
+        status = get_item_status(item)
+        status_counts[status] += 1
+        for field in totals:
+            totals[field] += item.get(field, 0)
+        if status == 'missing':
+            location = item.get('location') or 'Unassigned'
+            shortfall = item.get('requested', 0) - item.get('received', 0)
+            location_shortfall[location] = location_shortfall.get(location, 0) + shortfall
+    return {"status": status_counts, "totals": totals, "location": location_shortfall}
+
+class ShortfallHistory:
+    """Bounded time series of inventory aggregates.
+
+    Every snapshot is written to each tier. A tier keeps one point per
+    bucket (the latest snapshot in that bucket), so minutes roll up into
+    hours and days without re-reading item history, and each tier is a
+    fixed-size ring.
+
+    With a ``backend`` the rings are kept in durable storage instead, so
+    history survives restarts and every replica charts the same points.
+    """
+
+    TIERS = (
+        ("Minute", 60_000, 24 * 60),
+        ("Hour", 3_600_000, 24 * 30),
+        ("Day", 86_400_000, 365),
+    )
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.series = {name: deque(maxlen=capacity) for name, _, capacity in self.TIERS}
+        self.last_recorded: Optional[float] = None
+
+    def is_due(self, now: float) -> bool:
+        """True once per snapshot interval bucket"""
+        return self.last_recorded is None or now // SNAPSHOT_INTERVAL_MS != self.last_recorded // SNAPSHOT_INTERVAL_MS
+
+    def record(self, now: float, aggregates: Dict):
+        for name, width, capacity in self.TIERS:
+            point = {"t": now - now % width, **aggregates}
+            if self.backend is not None:
+                self.backend.put_history(name, point, capacity)
+                continue
+            series = self.series[name]
+            if series and series[-1]["t"] == point["t"]:
+                series[-1] = point
+            else:
+                series.append(point)
+        self.last_recorded = now
+
+    def points(self, tier: str) -> List[Dict]:
+        if self.backend is not None:
+            return self.backend.history(tier)
+        return list(self.series[tier])
+
+
+# Fields the grouped views can slice by, and the totals kept per group
+GROUP_FIELDS = ("location", "custodian", "expendable")
+GROUP_TOTALS = ("requested", "received", "missing")
+
+def group_value(field: str, item: Dict):
+    """Group an item falls into; blank text fields share one group"""
+    if field == "expendable":
+        return bool(item.get(field, False))
+    return (item.get(field) or "").strip() or "Unassigned"
+
+class GroupIndex:
+    """Item keys and running totals per value of one field.
+
+    Updated item by item as the store changes, so totals for every group
+    cost O(groups) and a drill-down only touches that group's items.
+    A change is staged first and committed only once every index has
+    staged it, so a bad item leaves all indexes untouched.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+        self.members: Dict[object, Set[str]] = {}
+        self.totals: Dict[object, Dict[str, int]] = {}
+
+    def add(self, key: str, item: Dict):
+        self.commit(key, self.stage(None, item))
+
+    def stage(self, previous: Optional[Dict], item: Optional[Dict]) -> Tuple:
+        """(old group, new group, new totals per touched group), without modifying the index"""
+        groups = []
+        totals: Dict[object, Dict[str, int]] = {}
+        for value, sign in ((previous, -1), (item, 1)):
+            if value is None:
+                groups.append(None)
+                continue
+            group = group_value(self.field, value)
+            if group not in totals:
+                totals[group] = dict(self.totals.get(group) or {"items": 0, **{field: 0 for field in GROUP_TOTALS}})
+            group_totals = totals[group]
+            group_totals["items"] += sign
+            for field in GROUP_TOTALS:
+                group_totals[field] += sign * value.get(field, 0)
+            groups.append(group)
+        return groups[0], groups[1], totals
+
+    def commit(self, key: str, staged: Tuple):
+        """Apply a change prepared by stage(); cannot fail part-way"""
+        old_group, new_group, totals = staged
+        if old_group is not None:
+            self.members.get(old_group, set()).discard(key)
+        if new_group is not None:
+            self.members.setdefault(new_group, set()).add(key)
+        for group, group_totals in totals.items():
+            if self.members.get(group):
+                self.totals[group] = group_totals
+            else:
+                self.members.pop(group, None)
+                self.totals.pop(group, None)
+
+def build_group_indexes(items: Dict) -> Dict[str, GroupIndex]:
+    indexes = {field: GroupIndex(field) for field in GROUP_FIELDS}
+    for key, item in items.items():
+        for index in indexes.values():
+            index.add(key, item)
+    return indexes
+
+# Hash trie fan-out: 32 children per node, 5 hash bits per level
+TRIE_BITS = 5
+TRIE_MASK = (1 << TRIE_BITS) - 1
+EMPTY_NODE = (None,) * (1 << TRIE_BITS)
+
+class _Leaf(NamedTuple):
+    hash: int
+    key: object
+    value: object
+
+class _Collision(NamedTuple):
+    """Keys whose full hashes are equal"""
+    hash: int
+    pairs: Tuple[Tuple[object, object], ...]
+
+def _trie_hash(key) -> int:
+    return hash(key) & 0xFFFFFFFFFFFFFFFF
+
+def _assoc(node, shift: int, h: int, key, value):
+    """Copy of ``node`` with key set; returns (node, added)"""
+    if node is None:
+        return _Leaf(h, key, value), True
+    if isinstance(node, _Leaf):
+        if node.key == key:
+            return _Leaf(h, key, value), False
+        if node.hash == h:
+            return _Collision(h, ((node.key, node.value), (key, value))), True
+    elif isinstance(node, _Collision):
+        if node.hash == h:
+            pairs = tuple(pair for pair in node.pairs if pair[0] != key)
+            return _Collision(h, pairs + ((key, value),)), len(pairs) == len(node.pairs)
+    else:
+        index = (h >> shift) & TRIE_MASK
+        child, added = _assoc(node[index], shift + TRIE_BITS, h, key, value)
+        return node[:index] + (child,) + node[index + 1:], added
+    # A leaf or collision with a different hash: push it one level down
+    index = (node.hash >> shift) & TRIE_MASK
+    branch = EMPTY_NODE[:index] + (node,) + EMPTY_NODE[index + 1:]
+    return _assoc(branch, shift, h, key, value)
+
+def _dissoc(node, shift: int, h: int, key):
+    """Copy of ``node`` without key; returns (node, removed)"""
+    if node is None:
+        return None, False
+    if isinstance(node, _Leaf):
+        return (None, True) if node.key == key else (node, False)
+    if isinstance(node, _Collision):
+        pairs = tuple(pair for pair in node.pairs if pair[0] != key)
+        if len(pairs) == len(node.pairs):
+            return node, False
+        return (_Leaf(h, *pairs[0]) if len(pairs) == 1 else _Collision(h, pairs)), True
+    index = (h >> shift) & TRIE_MASK
+    child, removed = _dissoc(node[index], shift + TRIE_BITS, h, key)
+    if not removed:
+        return node, False
+    node = node[:index] + (child,) + node[index + 1:]
+    remaining = [slot for slot in node if slot is not None]
+    if not remaining:
+        return None, True
+    if len(remaining) == 1 and type(remaining[0]) is not tuple:
+        # Collapse a branch holding a single leaf so lookups stay shallow
+        return remaining[0], True
+    return node, True
+
+def _walk(node) -> Iterator[Tuple[object, object]]:
+    if node is None:
+        return
+    if isinstance(node, _Leaf):
+        yield node.key, node.value
+    elif isinstance(node, _Collision):
+        yield from node.pairs
+    else:
+        for child in node:
+            if child is not None:
+                yield from _walk(child)
+
+class _TrieItems(ItemsView):
+    def __iter__(self):
+        return _walk(self._mapping._root)
+
+class _TrieValues(ValuesView):
+    def __iter__(self):
+        return (value for _, value in _walk(self._mapping._root))
+
+class PersistentMap(Mapping):
+    """Immutable mapping backed by a hash trie.
+
+    set() and delete() return a new map that copies only the path to the
+    changed key and shares every other node with this one, so keeping a
+    version after each change costs O(log n) memory, not a full copy.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, root=None, size: int = 0):
+        self._root = root
+        self._size = size
+
+    @classmethod
+    def from_dict(cls, items: Dict) -> "PersistentMap":
+        root = None
+        for key, value in items.items():
+            root, _ = _assoc(root, 0, _trie_hash(key), key, value)
+        return cls(root, len(items))
+
+    def set(self, key, value) -> "PersistentMap":
+        root, added = _assoc(self._root, 0, _trie_hash(key), key, value)
+        return PersistentMap(root, self._size + added)
+
+    def delete(self, key) -> "PersistentMap":
+        root, removed = _dissoc(self._root, 0, _trie_hash(key), key)
+        return PersistentMap(root, self._size - removed) if removed else self
+
+    def __getitem__(self, key):
+        h = _trie_hash(key)
+        node = self._root
+        shift = 0
+        while type(node) is tuple:
+            node = node[(h >> shift) & TRIE_MASK]
+            shift += TRIE_BITS
+        if isinstance(node, _Leaf) and node.key == key:
+            return node.value
+        if isinstance(node, _Collision):
+            for pair_key, value in node.pairs:
+                if pair_key == key:
+                    return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (key for key, _ in _walk(self._root))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def items(self) -> ItemsView:
+        return _TrieItems(self)
+
+    def values(self) -> ValuesView:
+        return _TrieValues(self)
+
+# Undo steps kept per store, and versions kept for point-in-time views
+UNDO_LIMIT = 100
+TIMELINE_LIMIT = 50_000
+
+class Change(NamedTuple):
+    """One undoable store change: (before, after) for every key it touched"""
+    timestamp: float
+    label: str
+    items: Dict[str, Tuple[Optional[Dict], Optional[Dict]]]
+    requests: Dict[str, Tuple[Optional[Dict], Optional[Dict]]]
+
+def describe_change(action: str, items: Dict, requests: Dict) -> str:
+    """Undo label naming what an action touched, e.g. "Assign Combat Helmet (item1)"."""
+    # A request being approved also adds an item; name the request
+    pairs = requests if len(requests) == 1 else items if len(items) == 1 and not requests else None
+    if pairs:
+        (key, (before, after)), = pairs.items()
+        name = (after or before or {}).get("itemName") or key
+        return f"{action} {name} ({key})"
+    counts = [f"{len(table)} {noun}{'' if len(table) == 1 else 's'}"
+              for table, noun in ((items, "item"), (requests, "request")) if table]
+    return f"{action} ({', '.join(counts)})"
+
+# Fields a new item or request must carry, mirroring the forms
+REQUIRED_ITEM_FIELDS = ("itemName", "requested")
+REQUIRED_REQUEST_FIELDS = ("itemName", "requested", "custodian", "location", "email")
+
+class InventoryError(Exception):
+    """Raised when an operation is not valid for an item's current state"""
+
+class InvalidFieldError(InventoryError):
+    """Raised when a field value has the wrong type or range"""
+
+# Expected type of each known item/request field; other fields are kept as given
+QUANTITY_FIELDS = ("requested", "onHand", "received", "missing")
+TEXT_FIELDS = ("itemName", "custodian", "location", "email", "phone")
+FLAG_FIELDS = ("expendable", "verified", "returned")
+TIME_FIELDS = ("timestamp", "dueDate")
+
+def check_quantity(name: str, value) -> int:
+    # bool is an int subclass, but True is not a quantity
+    if type(value) is not int or value < 0:
+        raise InvalidFieldError(f"{name} must be a non-negative integer")
+    return value
+
+def check_time(name: str, value) -> float:
+    # json.loads accepts NaN and Infinity, which would break heap ordering
+    if type(value) not in (int, float) or not math.isfinite(value):
+        raise InvalidFieldError(f"{name} must be a finite number of milliseconds")
+    return value
+
+def check_fields(fields: Dict):
+    """Validate known fields before anything is stored"""
+    if not isinstance(fields, dict):
+        raise InvalidFieldError("Each item must be a JSON object")
+    for name, value in fields.items():
+        if name in QUANTITY_FIELDS:
+            check_quantity(name, value)
+        elif name in TEXT_FIELDS and not isinstance(value, str):
+            raise InvalidFieldError(f"{name} must be a string")
+        elif name in FLAG_FIELDS and not isinstance(value, bool):
+            raise InvalidFieldError(f"{name} must be true or false")
+        elif name in TIME_FIELDS and not (name == "dueDate" and value is None):
+            check_time(name, value)
+
+def now_ms() -> float:
+    return datetime.now().timestamp() * 1000
+
+def next_key(prefix: str, existing: Dict) -> str:
+    """Keys follow the app's <prefix>_<n> scheme, skipping any already taken"""
+    n = len(existing) + 1
+    while f"{prefix}_{n}" in existing:
+        n += 1
+    return f"{prefix}_{n}"
+
+def new_item(fields: Dict) -> Dict:
+    """Item with the same defaults the admin "Add Item" form uses"""
+    check_fields(fields)
+    missing = [name for name in REQUIRED_ITEM_FIELDS if not fields.get(name)]
+    if missing:
+        raise InvalidFieldError(f"Missing required fields: {', '.join(missing)}")
+    item = {
+        "itemName": "",
+        "requested": 0,
+        "onHand": 0,
+        "received": 0,
+        "missing": 0,
+        "custodian": "",
+        "location": "",
+        "email": "",
+        "phone": "",
+        "expendable": False,
+        "verified": False,
+        "returned": False,
+        "timestamp": now_ms()
+    }
+    item.update(fields)
+    return item
+
+class InventoryStore:
+    """Inventory items and pending requests shared by every session and the API.
+
+    All changes go through these methods so the status rules behind the
+    admin actions apply no matter who makes them. Items are replaced rather
+    than modified in place, so a dict returned by snapshot() never changes
+    underneath its reader.
+
+    With a ``backend`` the in-memory dicts act as a cache over durable
+    storage shared with other processes: every change is written through
+    inside a backend transaction, rules are checked against the stored row,
+    and the changed keys are announced on ``feed`` so other replicas reload
+    just those entries (see inventory_sync).
+
+    Every change also yields a new PersistentMap version of the items, kept
+    on a timeline for point-in-time views, and an undoable Change holding
+    the before/after value of each key it touched.
+    """
+
+    def __init__(self, items: Optional[Dict] = None, requests: Optional[Dict] = None,
+                 backend=None, feed=None):
+        self._lock = threading.RLock()
+        self.backend = backend
+        self.feed = feed
+        self._changes: Optional[Dict] = None
+        if backend is not None:
+            items, requests = backend.load()
+        self.items: Dict[str, Dict] = copy.deepcopy(items) if items else {}
+        self.requests: Dict[str, Dict] = copy.deepcopy(requests) if requests else {}
+        self.version = 0
+        self.scheduler = build_return_scheduler(self.items)
+        self.groups = build_group_indexes(self.items)
+        self.history = ShortfallHistory(backend)
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self.item_versions = PersistentMap.from_dict(self.items)
+        self.timeline: List[Tuple[float, PersistentMap]] = [(now_ms(), self.item_versions)]
+        self.undo_stack: List[Change] = []
+        self.redo_stack: List[Change] = []
+
+    # Reads
+
+    def snapshot(self) -> PersistentMap:
+        """Read-only view of all items at this moment; O(1), nothing is copied"""
+        with self._lock:
+            return self.item_versions
+
+    def items_as_of(self, timestamp: float) -> Optional[PersistentMap]:
+        """Items as they were at ``timestamp``, or None if that predates the timeline"""
+        with self._lock:
+            index = bisect.bisect_right(self.timeline, timestamp, key=lambda entry: entry[0])
+            return self.timeline[index - 1][1] if index else None
+
+    def timeline_start(self) -> float:
+        """Time of the oldest version items_as_of() can return"""
+        with self._lock:
+            return self.timeline[0][0]
+
+    def pending_requests(self) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self.requests)
+
+    def get_item(self, key: str) -> Dict:
+        with self._lock:
+            return dict(self._item(key))
+
+    def list_items(self, status: Optional[str] = None, offset: int = 0,
+                   limit: Optional[int] = None) -> Tuple[int, List[Tuple[str, Dict]]]:
+        """Total matching items and one page of (key, item) pairs"""
+        with self._lock:
+            if status == 'overdue':
+                keys = [key for key in self.scheduler.check(now_ms()) if key in self.items]
+            elif status:
+                keys = [key for key, item in self.items.items() if get_item_status(item) == status]
+            else:
+                keys = list(self.items)
+            end = None if limit is None else offset + limit
+            return len(keys), [(key, dict(self.items[key])) for key in keys[offset:end]]
+
+    def overdue(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        with self._lock:
+            keys = self.scheduler.check(now_ms() if now is None else now)
+            return {key: self.items[key] for key in keys if key in self.items}
+
+    def next_return_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Earliest return deadline that has not passed yet, if any"""
+        with self._lock:
+            self.scheduler.check(now_ms() if now is None else now)
+            return self.scheduler.next_due()
+
+    def history_points(self, tier: str) -> List[Dict]:
+        """Trend points for one ShortfallHistory tier, oldest first"""
+        with self._lock:
+            return self.history.points(tier)
+
+    def group_totals(self, field: str) -> Dict[object, Dict[str, int]]:
+        """Item count and requested/received/missing totals for each group"""
+        with self._lock:
+            return {group: dict(totals) for group, totals in self.groups[field].totals.items()}
+
+    def group_items(self, field: str, group) -> Dict[str, Dict]:
+        """Items in one group, without scanning the rest of the inventory"""
+        with self._lock:
+            return {key: self.items[key] for key in self.groups[field].members.get(group, ())}
+
+    # Item changes
+
+    def add_item(self, fields: Dict, prefix: str = "admin_item") -> str:
+        with self._write("Add"):
+            key = next_key(prefix, self._keys("items"))
+            self._put(key, new_item(fields))
+            return key
+
+    def upsert_items(self, items: Iterable[Dict]) -> List[str]:
+        """Create or update many items at once; items with an "id" update that item"""
+        items = list(items)
+        for fields in items:
+            check_fields(fields)
+        with self._write("Update"):
+            keys = []
+            for fields in items:
+                fields = dict(fields)
+                key = fields.pop("id", None)
+                if key is not None and not isinstance(key, str):
+                    raise InvalidFieldError("id must be a string")
+                if key is not None and key in self._keys("items"):
+                    self._put(key, {**self._item(key), **fields})
+                else:
+                    key = key or next_key("admin_item", self._keys("items"))
+                    self._put(key, new_item(fields))
+                keys.append(key)
+            return keys
+
+    def receive(self, key: str, received: int) -> Dict:
+        """Set the received quantity of a missing item"""
+        check_quantity("received", received)
+        with self._write("Receive"):
+            item = self._item(key)
+            self._require_status(key, item, 'missing')
+            return self._put(key, {**item, "received": received})
+
+    def assign(self, key: str, due: Optional[float] = None) -> Dict:
+        """Assign a received item; non-expendable items get a return deadline"""
+        if due is not None:
+            check_time("dueDate", due)
+        with self._write("Assign"):
+            item = self._item(key)
+            self._require_status(key, item, 'received')
+            changes = {"verified": True}
+            if not item.get('expendable', False):
+                changes["dueDate"] = due if due is not None else now_ms() + DEFAULT_LOAN_DAYS * 86_400_000
+            return self._put(key, {**item, **changes})
+
+    def mark_returned(self, key: str) -> Dict:
+        with self._write("Mark returned"):
+            item = self._item(key)
+            self._require_status(key, item, 'assigned')
+            return self._put(key, {**item, "returned": True})
+
+    def record_missing(self, key: str, returned: int) -> Dict:
+        """Record how many of an assigned item came back; the rest is missing"""
+        check_quantity("returned", returned)
+        with self._write("Record missing"):
+            item = self._item(key)
+            self._require_status(key, item, 'assigned')
+            requested = item.get('requested', 0)
+            if not 0 <= returned <= requested:
+                raise InventoryError(f"Returned amount must be between 0 and {requested}")
+            return self._put(key, {**item, "missing": requested - returned, "received": returned})
+
+    def delete_item(self, key: str):
+        with self._write("Delete"):
+            self._item(key)
+            self._put(key, None)
+
+    # Requests
+
+    def submit_request(self, fields: Dict) -> str:
+        check_fields(fields)
+        missing = [name for name in REQUIRED_REQUEST_FIELDS if not fields.get(name)]
+        if missing:
+            raise InvalidFieldError(f"Missing required fields: {', '.join(missing)}")
+        with self._write("Submit request"):
+            key = next_key("req", self._keys("requests"))
+            self._put_request(key, {
+                "itemName": fields["itemName"],
+                "requested": fields["requested"],
+                "custodian": fields["custodian"],
+                "location": fields["location"],
+                "email": fields["email"],
+                "phone": fields.get("phone") or "",
+                "expendable": fields.get("expendable", False),
+                "timestamp": fields.get("timestamp") or now_ms()
+            })
+            return key
+
+    def approve_request(self, key: str) -> str:
+        """Move a request into inventory as a received item; returns the item key"""
+        with self._write("Approve request"):
+            request = self._request(key)
+            item_key = next_key("item", self._keys("items"))
+            self._put(item_key, new_item({
+                "itemName": request.get('itemName', ''),
+                "requested": request.get('requested', 0),
+                "received": request.get('requested', 0),  # Mark as received
+                "custodian": request.get('custodian', ''),
+                "location": request.get('location', ''),
+                "email": request.get('email', ''),
+                "phone": request.get('phone', ''),
+                "expendable": request.get('expendable', False),
+            }))
+            self._put_request(key, None)
+            return item_key
+
+    def deny_request(self, key: str):
+        with self._write("Deny request"):
+            self._request(key)
+            self._put_request(key, None)
+
+    def reset(self):
+        with self._write("Reset all data"):
+            if self.backend is not None:
+                # Include rows this replica has not cached yet
+                items, requests = self.backend.load()
+                for key, item in items.items():
+                    self._cache_item(key, item)
+                for key, request in requests.items():
+                    self._cache_request(key, request)
+            for key in list(self.items):
+                self._put(key, None)
+            for key in list(self.requests):
+                self._put_request(key, None)
+            self._changes["all"] = True
+
+    # Undo and redo
+
+    def undo(self) -> str:
+        """Revert the most recent change; returns its label"""
+        with self._write(record=False):
+            if not self.undo_stack:
+                raise InventoryError("Nothing to undo")
+            change = self.undo_stack[-1]
+            self._revert(change, undo=True)
+            self.redo_stack.append(self.undo_stack.pop())
+            return change.label
+
+    def redo(self) -> str:
+        """Reapply the most recently undone change; returns its label"""
+        with self._write(record=False):
+            if not self.redo_stack:
+                raise InventoryError("Nothing to redo")
+            change = self.redo_stack[-1]
+            self._revert(change, undo=False)
+            self.undo_stack.append(self.redo_stack.pop())
+            return change.label
+
+    def recent_changes(self, limit: int = 5) -> List[Change]:
+        """Most recent undoable changes, newest first; undo() reverts the first"""
+        with self._lock:
+            return self.undo_stack[:-limit - 1:-1]
+
+    def record_snapshot(self, now: Optional[float] = None):
+        """Take a history snapshot if the interval has elapsed"""
+        now = now_ms() if now is None else now
+        with self._lock:
+            if self.history.is_due(now):
+                if self.backend is None:
+                    self.history.record(now, compute_aggregates(self.items))
+                else:
+                    with self.backend.transaction():
+                        self.history.record(now, compute_aggregates(self.items))
+
+    def start_snapshots(self) -> threading.Thread:
+        """Record a history snapshot every interval from a daemon thread.
+
+        Snapshots then keep coming while no session is open and after a
+        burst of changes, so the trend lines follow the real timeline.
+        """
+        with self._lock:
+            if self._snapshot_thread is None:
+                self._snapshot_thread = threading.Thread(
+                    target=self._snapshot_loop, name="inventory-snapshots", daemon=True
+                )
+                self._snapshot_thread.start()
+            return self._snapshot_thread
+
+    # Changes made by other processes
+
+    def apply_changes(self, changes: Dict):
+        """Reload the entries another replica changed from the backend"""
+        if self.backend is None:
+            return
+        with self._lock:
+            if changes.get("all"):
+                items, requests = self.backend.load()
+                self.items = items
+                self.requests = requests
+                self.scheduler = build_return_scheduler(items)
+                self.groups = build_group_indexes(items)
+                self.item_versions = PersistentMap.from_dict(items)
+            else:
+                for key in changes.get("items", ()):
+                    self._cache_item(key, self.backend.get("items", key))
+                for key in changes.get("requests", ()):
+                    self._cache_request(key, self.backend.get("requests", key))
+            self.version += 1
+            self._record_version()
+
+    # Internals
+
+    def _snapshot_loop(self):
+        while True:
+            try:
+                self.record_snapshot()
+            except sqlite3.OperationalError:
+                # A busy or locked database skips one point; the next tick tries again
+                pass
+            except Exception:
+                logger.exception("Recording a history snapshot failed")
+            pytime.sleep(SNAPSHOT_INTERVAL_MS / 1000)
+
+    @contextmanager
+    def _write(self, label: str = "", record: bool = True):
+        """Group changes into one backend transaction, feed message and undo step"""
+        with self._lock:
+            if self._changes is not None:
+                yield
+                return
+            # Keys written so far, mapped to their value before this write
+            self._changes = {"items": {}, "requests": {}, "all": False}
+            try:
+                if self.backend is None:
+                    yield
+                else:
+                    with self.backend.transaction():
+                        yield
+            except BaseException:
+                if self.backend is None:
+                    # Put back the values from before this write
+                    for key, before in self._changes["items"].items():
+                        self._cache_item(key, before)
+                    for key, before in self._changes["requests"].items():
+                        self._cache_request(key, before)
+                else:
+                    # The backend rolled back; drop whatever was cached meanwhile
+                    self.apply_changes(self._changes)
+                raise
+            finally:
+                changes, self._changes = self._changes, None
+            if not (changes["items"] or changes["requests"]):
+                return
+            if record:
+                items = {key: (before, self.items.get(key)) for key, before in changes["items"].items()}
+                requests = {key: (before, self.requests.get(key)) for key, before in changes["requests"].items()}
+                self.undo_stack.append(Change(now_ms(), describe_change(label, items, requests), items, requests))
+                del self.undo_stack[:-UNDO_LIMIT]
+                self.redo_stack.clear()
+            self._record_version()
+            if self.feed is not None:
+                self.feed.publish(changes)
+
+    def _record_version(self):
+        self.timeline.append((now_ms(), self.item_versions))
+        if len(self.timeline) > TIMELINE_LIMIT:
+            del self.timeline[:len(self.timeline) - TIMELINE_LIMIT]
+
+    def _revert(self, change: Change, undo: bool):
+        """Write one side of ``change`` back, unless those keys changed again since"""
+        pick = (lambda pair: pair[0]) if undo else (lambda pair: pair[1])
+        expect = (lambda pair: pair[1]) if undo else (lambda pair: pair[0])
+        for table, pairs in (("items", change.items), ("requests", change.requests)):
+            for key, pair in pairs.items():
+                if self._current(table, key) != expect(pair):
+                    raise InventoryError(f"{key} has changed since '{change.label}'")
+        for key, pair in change.items.items():
+            self._put(key, pick(pair))
+        for key, pair in change.requests.items():
+            self._put_request(key, pick(pair))
+
+    def _current(self, table: str, key: str) -> Optional[Dict]:
+        """Stored value of a key, refreshed from the backend inside a write"""
+        if table == "items":
+            if self._changes is not None and self.backend is not None:
+                self._cache_item(key, self.backend.get("items", key))
+            return self.items.get(key)
+        if self._changes is not None and self.backend is not None:
+            self._cache_request(key, self.backend.get("requests", key))
+        return self.requests.get(key)
+
+    def _keys(self, table: str):
+        """Key space used to allocate new keys, including other replicas' entries"""
+        if self.backend is not None:
+            return self.backend.keys(table)
+        return self.items if table == "items" else self.requests
+
+    def _item(self, key: str) -> Dict:
+        # Check rules against the stored row, not a possibly stale cache
+        item = self._current("items", key)
+        if item is None:
+            raise KeyError(key)
+        return item
+
+    def _request(self, key: str) -> Dict:
+        request = self._current("requests", key)
+        if request is None:
+            raise KeyError(key)
+        return request
+
+    def _require_status(self, key: str, item: Dict, status: str):
+        current = get_item_status(item)
+        if current != status:
+            raise InventoryError(f"Item {key} is {current}, expected {status}")
+
+    def _put(self, key: str, item: Optional[Dict]) -> Optional[Dict]:
+        """Store (or with None, delete) an item"""
+        if self.backend is not None:
+            self.backend.put("items", key, item)
+        self._changes["items"].setdefault(key, self.items.get(key))
+        self._cache_item(key, item)
+        return dict(item) if item is not None else None
+
+    def _put_request(self, key: str, request: Optional[Dict]):
+        if self.backend is not None:
+            self.backend.put("requests", key, request)
+        self._changes["requests"].setdefault(key, self.requests.get(key))
+        self._cache_request(key, request)
+
+    def _cache_item(self, key: str, item: Optional[Dict]):
+        # Work out everything that can fail before changing any state
+        previous = self.items.get(key)
+        staged = [(index, index.stage(previous, item)) for index in self.groups.values()]
+        due = None
+        if item is not None and get_item_status(item) == 'assigned':
+            due = item.get('dueDate')
+        if item is None:
+            self.items.pop(key, None)
+            self.item_versions = self.item_versions.delete(key)
+        else:
+            self.items[key] = item
+            self.item_versions = self.item_versions.set(key, item)
+        for index, change in staged:
+            index.commit(key, change)
+        if due is not None:
+            self.scheduler.schedule(key, due)
+        else:
+            self.scheduler.cancel(key)
+        self.version += 1
+
+    def _cache_request(self, key: str, request: Optional[Dict]):
+        if request is None:
+            self.requests.pop(key, None)
+        else:
+            self.requests[key] = request
+        self.version += 1
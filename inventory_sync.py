@@ -0,0 +1,250 @@
+"""Cross-process sharing for running several app replicas on one host.
+
+Replicas keep their InventoryStore in memory but write through to one
+SQLite file (WAL mode), and announce the keys they changed on a small
+Unix-socket pub/sub broker. Every other replica reloads just those rows,
+so caches stay warm and only changed items are invalidated.
+
+    python inventory_sync.py broker --socket /tmp/inventory-feed.sock
+    INVENTORY_DB_PATH=/tmp/inventory.db INVENTORY_FEED_SOCKET=/tmp/inventory-feed.sock \\
+        streamlit run streamlit_app.py --server.port 5001
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from inventory_core import InventoryStore
+
+TABLES = ("items", "requests")
+RECONNECT_DELAY = 0.5
+# Stays under asyncio's default 64 KiB line limit in the broker
+MAX_MESSAGE_BYTES = 32 * 1024
+
+
+class TableKeys:
+    """len() and ``in`` over a table's keys, for allocating new keys"""
+
+    def __init__(self, conn: sqlite3.Connection, table: str):
+        self.conn = conn
+        self.table = table
+
+    def __contains__(self, key) -> bool:
+        return self.conn.execute(f"SELECT 1 FROM {self.table} WHERE key = ?", (key,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class SqliteBackend:
+    """Items and requests stored as JSON rows in one SQLite file"""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        for table in TABLES:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS history (tier TEXT, t REAL, data TEXT NOT NULL, PRIMARY KEY (tier, t))"
+        )
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction; BEGIN IMMEDIATE serializes writers across processes"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def load(self) -> Tuple[Dict, Dict]:
+        items, requests = (
+            {key: json.loads(data) for key, data in self.conn.execute(f"SELECT key, data FROM {table}")}
+            for table in TABLES
+        )
+        return items, requests
+
+    def get(self, table: str, key: str) -> Optional[Dict]:
+        row = self.conn.execute(f"SELECT data FROM {table} WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, table: str, key: str, value: Optional[Dict]):
+        """Insert or replace a row; None deletes it"""
+        if value is None:
+            self.conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        else:
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {table} (key, data) VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+    def put_history(self, tier: str, point: Dict, capacity: int):
+        """Replace the point for its bucket and keep only the newest ``capacity``"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO history (tier, t, data) VALUES (?, ?, ?)", (tier, point["t"], json.dumps(point))
+        )
+        self.conn.execute(
+            "DELETE FROM history WHERE tier = ? AND t <= "
+            "(SELECT t FROM history WHERE tier = ? ORDER BY t DESC LIMIT 1 OFFSET ?)",
+            (tier, tier, capacity)
+        )
+
+    def history(self, tier: str) -> List[Dict]:
+        return [json.loads(data) for data, in self.conn.execute(
+            "SELECT data FROM history WHERE tier = ? ORDER BY t", (tier,)
+        )]
+
+    def keys(self, table: str) -> TableKeys:
+        return TableKeys(self.conn, table)
+
+    def seed(self, items: Dict):
+        """Insert ``items`` only if the store has never held any data"""
+        with self.transaction():
+            if all(len(self.keys(table)) == 0 for table in TABLES):
+                for key, item in items.items():
+                    self.put("items", key, item)
+
+
+def encode_changes(changes: Dict) -> bytes:
+    message = (json.dumps({
+        "items": sorted(changes.get("items", ())),
+        "requests": sorted(changes.get("requests", ())),
+        "all": bool(changes.get("all", False)),
+    }) + "\n").encode()
+    if len(message) > MAX_MESSAGE_BYTES:
+        # Too many keys for one feed line; peers reload everything instead
+        return encode_changes({"all": True})
+    return message
+
+
+class FeedBroker:
+    """Relays each line a replica sends to every other connected replica"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.writers = set()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                others = [other for other in self.writers if other is not writer]
+                for other in others:
+                    other.write(line)
+                await asyncio.gather(*(other.drain() for other in others), return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def serve(self) -> asyncio.AbstractServer:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        return await asyncio.start_unix_server(self.handle, self.path)
+
+
+class FeedClient:
+    """Publishes this replica's changes and hands other replicas' changes to ``on_changes``.
+
+    publish() only queues the message; a sender thread writes it. The
+    store calls publish() while holding its lock, and a blocking send
+    there could deadlock with this replica's listener, which needs that
+    lock to apply incoming changes before the broker can relay more.
+    """
+
+    def __init__(self, path: str, on_changes: Callable[[Dict], None]):
+        self.path = path
+        self.on_changes = on_changes
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._outbox: "queue.SimpleQueue[bytes]" = queue.SimpleQueue()
+        self._connected = threading.Event()
+        threading.Thread(target=self._send, name="inventory-feed-send", daemon=True).start()
+        thread = threading.Thread(target=self._listen, name="inventory-feed", daemon=True)
+        thread.start()
+        self._connected.wait(timeout=5)
+
+    def publish(self, changes: Dict):
+        self._outbox.put(encode_changes(changes))
+
+    def _send(self):
+        while True:
+            message = self._outbox.get()
+            with self._send_lock:
+                sock = self._sock
+            if sock is None:
+                # Peers reload everything when this replica reconnects
+                continue
+            try:
+                sock.sendall(message)
+            except OSError:
+                pass
+
+    def _listen(self):
+        reconnecting = False
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                time.sleep(RECONNECT_DELAY)
+                continue
+            with self._send_lock:
+                self._sock = sock
+            # Anything published while we were not subscribed was missed
+            self.on_changes({"all": True})
+            if reconnecting:
+                self.publish({"all": True})
+            self._connected.set()
+            try:
+                for line in sock.makefile("rb"):
+                    self.on_changes(json.loads(line))
+            except (OSError, ValueError):
+                pass
+            with self._send_lock:
+                self._sock = None
+            sock.close()
+            reconnecting = True
+            time.sleep(RECONNECT_DELAY)
+
+
+def open_replica_store(db_path: str, feed_path: Optional[str] = None,
+                       seed: Optional[Dict] = None) -> InventoryStore:
+    """InventoryStore backed by ``db_path`` and subscribed to the broker at ``feed_path``"""
+    backend = SqliteBackend(db_path)
+    if seed:
+        backend.seed(seed)
+    store = InventoryStore(backend=backend)
+    if feed_path:
+        store.feed = FeedClient(feed_path, store.apply_changes)
+    return store
+
+
+async def run_broker(path: str):
+    server = await FeedBroker(path).serve()
+    print(f"Inventory change feed listening on {path}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory replica tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    broker = subcommands.add_parser("broker", help="run the change feed broker")
+    broker.add_argument("--socket", default="/tmp/inventory-feed.sock")
+    args = parser.parse_args()
+    asyncio.run(run_broker(args.socket))
@@ -0,0 +1,39 @@
+#!/bin/bash
+
+# Run several Streamlit replicas sharing one inventory store.
+# Usage: ./run_replicas.sh [replica count] [first port]
+#
+# Put a reverse proxy with sticky sessions in front of the replicas
+# (Streamlit sessions live on a websocket), e.g. nginx with ip_hash:
+#   upstream inventory { ip_hash; server 127.0.0.1:5001; server 127.0.0.1:5002; }
+
+REPLICAS=${1:-3}
+FIRST_PORT=${2:-5001}
+export INVENTORY_DB_PATH=${INVENTORY_DB_PATH:-/tmp/inventory.db}
+export INVENTORY_FEED_SOCKET=${INVENTORY_FEED_SOCKET:-/tmp/inventory-feed.sock}
+
+PID_FILE=${INVENTORY_PID_FILE:-/tmp/inventory-replicas.pids}
+
+# Stop the replicas and broker a previous run of this script started
+if [ -f "$PID_FILE" ]; then
+    kill $(cat "$PID_FILE") 2>/dev/null
+    rm -f "$PID_FILE"
+    sleep 2
+fi
+
+stop_started() {
+    kill $(cat "$PID_FILE") 2>/dev/null
+    rm -f "$PID_FILE"
+}
+trap stop_started EXIT
+trap exit INT TERM
+
+python inventory_sync.py broker --socket "$INVENTORY_FEED_SOCKET" &
+echo $! >> "$PID_FILE"
+
+for ((i = 0; i < REPLICAS; i++)); do
+    streamlit run streamlit_app.py --server.port $((FIRST_PORT + i)) --server.address 0.0.0.0 --server.headless true --browser.gatherUsageStats false &
+    echo $! >> "$PID_FILE"
+done
+
+wait
@@ -1,9 +1,22 @@
 import streamlit as st
-import pandas as pd
 import json
-from datetime import datetime
+import os
+from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional
 
+# pandas is imported inside the functions that build tables and charts so
+# the password prompt can paint without loading it
+from inventory_core import (
+    DEFAULT_LOAN_DAYS,
+    SAMPLE_INVENTORY,
+    InventoryError,
+    InventoryStore,
+    ShortfallHistory,
+    due_date_to_ms,
+    format_due_date,
+    get_item_status,
+)
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="AESA Squadron 72 Inventory Management",
@@ -246,83 +259,58 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state matching React app exactly
-if "inventory_items" not in st.session_state:
-    st.session_state.inventory_items = {}
-if "requests" not in st.session_state:
-    st.session_state.requests = {}
-if "authenticated" not in st.session_state:
-    st.session_state.authenticated = False
-if "event_name" not in st.session_state:
-    st.session_state.event_name = "AESA Squadron 72"
-if "password_required" not in st.session_state:
-    st.session_state.password_required = True
-if "survey_enabled" not in st.session_state:
-    st.session_state.survey_enabled = False
-if "current_filter" not in st.session_state:
-    st.session_state.current_filter = None
-
-# Sample data matching React app structure
-SAMPLE_INVENTORY = {
-    "item1": {
-        "itemName": "Combat Helmet",
-        "requested": 5,
-        "onHand": 2,
-        "received": 3,
-        "missing": 0,
-        "custodian": "SSgt Johnson",
-        "location": "Supply Room A",
-        "email": "johnson@example.com",
-        "phone": "555-0101",
-        "expendable": False,
-        "verified": False,
-        "returned": False,
-        "timestamp": 1735862400000
-    },
-    "item2": {
-        "itemName": "Field Radio",
-        "requested": 3,
-        "onHand": 1,
-        "received": 0,
-        "missing": 3,
-        "custodian": "A1C Smith",
-        "location": "Comm Center",
-        "email": "smith@example.com",
-        "phone": "555-0102",
-        "expendable": False,
-        "verified": False,
-        "returned": False,
-        "timestamp": 1735862400000
-    },
-    "item3": {
-        "itemName": "Night Vision Goggles",
-        "requested": 2,
-        "onHand": 2,
-        "received": 2,
-        "missing": 0,
-        "custodian": "TSgt Davis",
-        "location": "Equipment Bay",
-        "email": "davis@example.com",
-        "phone": "555-0103",
-        "expendable": False,
-        "verified": True,
-        "returned": False,
-        "timestamp": 1735862400000
+def init_session_state():
+    """Initialize session state matching React app exactly, once per session"""
+    if st.session_state.get("initialized", False):
+        return
+    defaults = {
+        "authenticated": False,
+        "event_name": "AESA Squadron 72",
+        "password_required": True,
+        "survey_enabled": False,
+        "current_filter": None,
     }
-}
+    for name, value in defaults.items():
+        if name not in st.session_state:
+            st.session_state[name] = value
+    st.session_state.initialized = True
+
+@st.cache_resource
+def get_store() -> InventoryStore:
+    """Inventory shared by every session in this process, seeded with sample data.
+
+    With INVENTORY_DB_PATH set the store is shared with other replicas
+    through that database and the INVENTORY_FEED_SOCKET change feed.
+    """
+    db_path = os.environ.get("INVENTORY_DB_PATH")
+    if db_path:
+        from inventory_sync import open_replica_store
+        store = open_replica_store(db_path, os.environ.get("INVENTORY_FEED_SOCKET"), SAMPLE_INVENTORY)
+    else:
+        store = InventoryStore(SAMPLE_INVENTORY)
+    store.start_snapshots()
+    start_api_if_configured(store)
+    return store
 
-if not st.session_state.inventory_items:
-    st.session_state.inventory_items = SAMPLE_INVENTORY
+def start_api_if_configured(store: InventoryStore):
+    """Serve the JSON API from this process when INVENTORY_API_PORT is set"""
+    port = os.environ.get("INVENTORY_API_PORT")
+    if port:
+        from inventory_api import start_api_thread
+        start_api_thread(store, os.environ.get("INVENTORY_API_HOST", "127.0.0.1"), int(port))
 
-def get_item_status(item):
-    """Get item status exactly like React app"""
-    if item.get('returned', False):
-        return 'returned'
-    if item.get('verified', False):
-        return 'assigned'
-    if (item.get('received', 0) >= item.get('requested', 0)):
-        return 'received'
-    return 'missing'
+def apply_change(change, success_message: str):
+    """Apply a store change and rerun, or show why it was rejected"""
+    try:
+        change()
+    except InventoryError as error:
+        st.error(f"❌ {error}")
+        return
+    except KeyError:
+        st.error("❌ This entry no longer exists")
+        return
+    st.success(success_message)
+    st.rerun()
 
 def render_header():
     """Render header exactly matching React app"""
@@ -391,8 +379,7 @@ def render_request_form():
         
         if submit_btn:
             if item_name and requested and custodian and location and email:
-                new_key = f"req_{len(st.session_state.requests) + 1}"
-                st.session_state.requests[new_key] = {
+                get_store().submit_request({
                     "itemName": item_name,
                     "requested": requested,
                     "custodian": custodian,
@@ -401,7 +388,7 @@ def render_request_form():
                     "phone": phone or "",
                     "expendable": expendable == "Expendable (Consumable)",
                     "timestamp": datetime.now().timestamp() * 1000
-                }
+                })
                 st.success(f"✅ Your request for {item_name} has been submitted successfully.")
                 st.rerun()
             else:
@@ -409,6 +396,27 @@ def render_request_form():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def build_table_rows(items: Dict) -> List[Dict]:
+    """Create table data exactly matching React app"""
+    table_data = []
+    for key, item in items.items():
+        status = get_item_status(item)
+        table_data.append({
+            "Item Name": item.get("itemName", ""),
+            "Requested": item.get("requested", 0),
+            "On Hand": item.get("onHand", 0),
+            "Received": item.get("received", 0),
+            "Missing": item.get("missing", 0),
+            "Custodian": item.get("custodian", ""),
+            "Location": item.get("location", ""),
+            "Contact": f"{item.get('email', '')}\n{item.get('phone', '')}",
+            "Type": "Expendable" if item.get("expendable", False) else "Non-Expendable",
+            "Due Date": format_due_date(item),
+            "Status": status.title(),
+            "Actions": "Actions"
+        })
+    return table_data
+
 def render_inventory_table():
     """Inventory table exactly matching React app"""
     st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
@@ -422,9 +430,14 @@ def render_inventory_table():
     </div>
     """, unsafe_allow_html=True)
     
+    import pandas as pd
+    
+    store = get_store()
+    inventory_items = store.snapshot()
+    
     # Filter buttons exactly like React app
     st.markdown("**Filters:**")
-    col1, col2, col3, col4, col5 = st.columns(5)
+    col1, col2, col3, col4, col_overdue, col5 = st.columns(6)
     
     with col1:
         if st.button("⚠️ Missing", key="filter_missing"):
@@ -442,11 +455,15 @@ def render_inventory_table():
         if st.button("🔄 Returned", key="filter_returned"):
             st.session_state.current_filter = 'returned' if st.session_state.current_filter != 'returned' else None
     
+    with col_overdue:
+        if st.button("⏰ Overdue", key="filter_overdue"):
+            st.session_state.current_filter = 'overdue' if st.session_state.current_filter != 'overdue' else None
+    
     with col5:
         if st.button("📊 Export", key="export_btn"):
             # Export functionality
             items_list = []
-            for key, item in st.session_state.inventory_items.items():
+            for key, item in inventory_items.items():
                 status = get_item_status(item)
                 items_list.append({
                     "Item Name": item.get("itemName", ""),
@@ -459,6 +476,7 @@ def render_inventory_table():
                     "Email": item.get("email", ""),
                     "Phone": item.get("phone", ""),
                     "Expendable": "Yes" if item.get("expendable", False) else "No",
+                    "Due Date": format_due_date(item),
                     "Status": status.title()
                 })
             
@@ -472,34 +490,24 @@ def render_inventory_table():
                     mime="text/csv"
                 )
     
+    next_due = store.next_return_due()
+    if next_due is not None:
+        st.caption(f"⏰ Next return due {datetime.fromtimestamp(next_due / 1000).strftime('%Y-%m-%d')}")
+    
     # Filter items based on current filter
     filtered_items = {}
-    for key, item in st.session_state.inventory_items.items():
-        if st.session_state.current_filter is None:
-            filtered_items[key] = item
-        elif get_item_status(item) == st.session_state.current_filter:
-            filtered_items[key] = item
+    if st.session_state.current_filter == 'overdue':
+        # Overdue items come straight from the deadline heap, no table scan
+        filtered_items = store.overdue()
+    else:
+        for key, item in inventory_items.items():
+            if st.session_state.current_filter is None:
+                filtered_items[key] = item
+            elif get_item_status(item) == st.session_state.current_filter:
+                filtered_items[key] = item
     
     if filtered_items:
-        # Create table data exactly matching React app
-        table_data = []
-        for key, item in filtered_items.items():
-            status = get_item_status(item)
-            table_data.append({
-                "Item Name": item.get("itemName", ""),
-                "Requested": item.get("requested", 0),
-                "On Hand": item.get("onHand", 0),
-                "Received": item.get("received", 0),
-                "Missing": item.get("missing", 0),
-                "Custodian": item.get("custodian", ""),
-                "Location": item.get("location", ""),
-                "Contact": f"{item.get('email', '')}\n{item.get('phone', '')}",
-                "Type": "Expendable" if item.get("expendable", False) else "Non-Expendable",
-                "Status": status.title(),
-                "Actions": "Actions"
-            })
-        
-        df = pd.DataFrame(table_data)
+        df = pd.DataFrame(build_table_rows(filtered_items))
         st.dataframe(df, use_container_width=True, hide_index=True)
         
         # Action buttons for each item (admin only)
@@ -518,32 +526,43 @@ def render_inventory_table():
                         with col2:
                             if st.button(f"➕ Add Received", key=f"add_recv_{key}"):
                                 if received_qty >= 0:
-                                    st.session_state.inventory_items[key]['received'] = received_qty
-                                    st.success(f"✅ Updated received quantity to {received_qty}")
-                                    st.rerun()
+                                    apply_change(
+                                        lambda: store.receive(key, received_qty),
+                                        f"✅ Updated received quantity to {received_qty}"
+                                    )
                     
                     elif status == 'received':
+                        if not item.get('expendable', False):
+                            with col2:
+                                due = st.date_input(
+                                    "Return Due Date",
+                                    value=date.today() + timedelta(days=DEFAULT_LOAN_DAYS),
+                                    key=f"due_{key}"
+                                )
                         with col1:
                             if st.button(f"🛡️ Assign", key=f"assign_{key}"):
-                                st.session_state.inventory_items[key]['verified'] = True
-                                st.success(f"✅ Item has been assigned successfully")
-                                st.rerun()
+                                due_ms = None if item.get('expendable', False) else due_date_to_ms(due)
+                                apply_change(
+                                    lambda: store.assign(key, due_ms),
+                                    f"✅ Item has been assigned successfully"
+                                )
                     
                     elif status == 'assigned':
                         with col1:
                             if st.button(f"🔄 Mark Returned", key=f"return_{key}"):
-                                st.session_state.inventory_items[key]['returned'] = True
-                                st.success(f"✅ Item has been marked as returned")
-                                st.rerun()
+                                apply_change(
+                                    lambda: store.mark_returned(key),
+                                    f"✅ Item has been marked as returned"
+                                )
                         with col2:
                             returned_amt = st.number_input(f"Amount Returned", min_value=0, max_value=item.get('requested', 0), key=f"ret_amt_{key}")
                         with col3:
                             if st.button(f"➖ Record Missing", key=f"missing_{key}"):
                                 missing = item.get('requested', 0) - returned_amt
-                                st.session_state.inventory_items[key]['missing'] = missing
-                                st.session_state.inventory_items[key]['received'] = returned_amt
-                                st.success(f"✅ Missing quantity set to {missing}")
-                                st.rerun()
+                                apply_change(
+                                    lambda: store.record_missing(key, returned_amt),
+                                    f"✅ Missing quantity set to {missing}"
+                                )
                     
                     # Edit and Delete buttons for all items
                     with col3:
@@ -551,9 +570,62 @@ def render_inventory_table():
                             st.info("Edit functionality would open a dialog here")
                         if st.button(f"🗑️ Delete", key=f"delete_{key}"):
                             if st.button(f"⚠️ Confirm Delete", key=f"confirm_del_{key}"):
-                                del st.session_state.inventory_items[key]
-                                st.success(f"✅ Item deleted successfully")
-                                st.rerun()
+                                apply_change(
+                                    lambda: store.delete_item(key),
+                                    f"✅ Item deleted successfully"
+                                )
+    else:
+        st.info("No inventory items found.")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Grouped view labels to the store's group fields
+GROUP_BY_OPTIONS = {"Location": "location", "Custodian": "custodian", "Item Type": "expendable"}
+
+def format_group(field: str, group) -> str:
+    if field == "expendable":
+        return "Expendable" if group else "Non-Expendable"
+    return group
+
+def render_grouped_views():
+    """Totals per location, custodian or item type with drill-down"""
+    import pandas as pd
+    
+    st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="card-title">
+        📂 Grouped Views
+    </div>
+    <div class="card-description">
+        Requested, received and missing totals by location, custodian or item type
+    </div>
+    """, unsafe_allow_html=True)
+    
+    store = get_store()
+    label = st.radio("Group By", list(GROUP_BY_OPTIONS), horizontal=True, key="group_by")
+    field = GROUP_BY_OPTIONS[label]
+    totals = store.group_totals(field)
+    
+    if totals:
+        groups = sorted(totals, key=lambda group: format_group(field, group))
+        st.dataframe(pd.DataFrame([{
+            label: format_group(field, group),
+            "Items": totals[group]["items"],
+            "Requested": totals[group]["requested"],
+            "Received": totals[group]["received"],
+            "Missing": totals[group]["missing"],
+            "Outstanding": totals[group]["requested"] - totals[group]["received"]
+        } for group in groups]), use_container_width=True, hide_index=True)
+        
+        group = st.selectbox(
+            f"Show items for {label.lower()}",
+            groups,
+            format_func=lambda group: format_group(field, group),
+            key=f"group_drill_{field}"
+        )
+        group_items = store.group_items(field, group)
+        if group_items:
+            st.dataframe(pd.DataFrame(build_table_rows(group_items)), use_container_width=True, hide_index=True)
     else:
         st.info("No inventory items found.")
     
@@ -656,22 +728,17 @@ def render_admin_panel():
         
         if st.form_submit_button("🛡️ Add Item", type="primary"):
             if item_name and requested:
-                new_key = f"admin_item_{len(st.session_state.inventory_items) + 1}"
-                st.session_state.inventory_items[new_key] = {
+                get_store().add_item({
                     "itemName": item_name,
                     "requested": requested,
                     "onHand": on_hand,
-                    "received": 0,
-                    "missing": 0,
                     "custodian": custodian or "",
                     "location": location or "",
                     "email": email or "",
                     "phone": phone or "",
                     "expendable": expendable == "Expendable",
-                    "verified": False,
-                    "returned": False,
                     "timestamp": datetime.now().timestamp() * 1000
-                }
+                })
                 st.success(f"✅ {item_name} has been added to inventory successfully")
                 st.rerun()
             else:
@@ -679,6 +746,96 @@ def render_admin_panel():
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+    # Hand Receipts
+    st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="card-title">
+        🧾 Hand Receipts
+    </div>
+    <div class="card-description">
+        Generate a printable hand receipt for every custodian
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if st.button("🧾 Generate Hand Receipts", key="hand_receipts_btn"):
+        from hand_receipts import build_hand_receipts
+        store = get_store()
+        # Read the version first so a concurrent change can only make the cache miss
+        version = store.version
+        progress_bar = st.progress(0, text="Rendering hand receipts...")
+        receipts = build_hand_receipts(
+            store.snapshot(),
+            st.session_state.event_name,
+            version,
+            progress=lambda done, total: progress_bar.progress(done / total, text=f"Rendered {done} of {total} custodians")
+        )
+        progress_bar.empty()
+        st.download_button(
+            label="💾 Download Hand Receipts",
+            data=receipts,
+            file_name=f"hand_receipts_{datetime.now().strftime('%Y-%m-%d')}.zip",
+            mime="application/zip"
+        )
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Change History
+    st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="card-title">
+        🕘 Change History
+    </div>
+    <div class="card-description">
+        Undo recent changes or view the inventory as it was at an earlier time
+    </div>
+    """, unsafe_allow_html=True)
+    
+    store = get_store()
+    recent = store.recent_changes()
+    undo_label = recent[0].label if recent else None
+    redo_label = store.redo_stack[-1].label if store.redo_stack else None
+    
+    if recent:
+        # Undo is shared by every session, so show whose changes come next
+        st.caption("Recent changes by any user, newest first — Undo reverts the top one")
+        for change in recent:
+            changed_at = datetime.fromtimestamp(change.timestamp / 1000).strftime('%H:%M:%S')
+            st.markdown(f"- `{changed_at}` {change.label}")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"↩️ Undo {undo_label}" if undo_label else "↩️ Undo", key="undo_btn", disabled=not undo_label):
+            apply_change(store.undo, f"✅ Undid '{undo_label}'")
+    with col2:
+        if st.button(f"↪️ Redo {redo_label}" if redo_label else "↪️ Redo", key="redo_btn", disabled=not redo_label):
+            apply_change(store.redo, f"✅ Redid '{redo_label}'")
+    
+    with st.expander("🔍 View inventory as of a point in time"):
+        history_start = datetime.fromtimestamp(store.timeline_start() / 1000)
+        st.caption(
+            f"History covers this server process only, since {history_start.strftime('%Y-%m-%d %H:%M:%S')}. "
+            "It is not kept across restarts or shared between replicas."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            as_of_date = st.date_input("Date", value=date.today(), key="as_of_date")
+        with col2:
+            as_of_time = st.time_input("Time", value=datetime.now().time(), key="as_of_time")
+        as_of = datetime.combine(as_of_date, as_of_time)
+        as_of_ms = as_of.timestamp() * 1000
+        if as_of_ms < store.timeline_start() <= as_of_ms + 60_000:
+            # The picker only resolves minutes; the minute history starts in counts
+            as_of_ms = store.timeline_start()
+        past_items = store.items_as_of(as_of_ms)
+        if past_items is None:
+            st.info(f"No history was recorded that far back; it starts at {history_start.strftime('%H:%M:%S')}.")
+        elif past_items:
+            import pandas as pd
+            st.caption(f"Read-only view of {len(past_items)} item(s) as of {as_of.strftime('%Y-%m-%d %H:%M')}")
+            st.dataframe(pd.DataFrame(build_table_rows(past_items)), use_container_width=True, hide_index=True)
+        else:
+            st.info("The inventory was empty at that time.")
+    st.markdown('</div>', unsafe_allow_html=True)
+    
     # Reset Data
     st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
     st.markdown("**⚠️ Danger Zone**")
@@ -687,8 +844,7 @@ def render_admin_panel():
         master_password = st.text_input("Enter master password to reset:", type="password", key="master_pwd")
         if st.button("⚠️ Confirm Reset", type="secondary"):
             if master_password == "Ku2023!@":
-                st.session_state.inventory_items = {}
-                st.session_state.requests = {}
+                get_store().reset()
                 st.success("✅ All data has been reset")
                 st.rerun()
             else:
@@ -712,10 +868,13 @@ def render_pending_requests():
     </div>
     """, unsafe_allow_html=True)
     
-    if st.session_state.requests:
-        st.markdown(f"**{len(st.session_state.requests)} pending request(s)**")
+    store = get_store()
+    requests = store.pending_requests()
+    
+    if requests:
+        st.markdown(f"**{len(requests)} pending request(s)**")
         
-        for req_key, request in st.session_state.requests.items():
+        for req_key, request in requests.items():
             with st.container():
                 st.markdown("---")
                 col1, col2, col3 = st.columns([3, 2, 2])
@@ -737,46 +896,75 @@ def render_pending_requests():
                     with col_approve:
                         if st.button("✅ Approve", key=f"approve_{req_key}"):
                             # Move to inventory
-                            new_key = f"item_{len(st.session_state.inventory_items) + 1}"
-                            st.session_state.inventory_items[new_key] = {
-                                "itemName": request.get('itemName', ''),
-                                "requested": request.get('requested', 0),
-                                "onHand": 0,
-                                "received": request.get('requested', 0),  # Mark as received
-                                "missing": 0,
-                                "custodian": request.get('custodian', ''),
-                                "location": request.get('location', ''),
-                                "email": request.get('email', ''),
-                                "phone": request.get('phone', ''),
-                                "expendable": request.get('expendable', False),
-                                "verified": False,
-                                "returned": False,
-                                "timestamp": datetime.now().timestamp() * 1000
-                            }
-                            del st.session_state.requests[req_key]
-                            st.success(f"✅ Approved {request.get('itemName')} - Added to inventory")
-                            st.rerun()
+                            apply_change(
+                                lambda: store.approve_request(req_key),
+                                f"✅ Approved {request.get('itemName')} - Added to inventory"
+                            )
                     
                     with col_deny:
                         if st.button("❌ Deny", key=f"deny_{req_key}"):
-                            del st.session_state.requests[req_key]
-                            st.success(f"❌ Denied {request.get('itemName')}")
-                            st.rerun()
+                            apply_change(
+                                lambda: store.deny_request(req_key),
+                                f"❌ Denied {request.get('itemName')}"
+                            )
     else:
         st.info("📭 No pending requests")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def render_trends():
+    """Shortfall trend charts from the pre-aggregated history"""
+    st.markdown('<div class="inventory-card">', unsafe_allow_html=True)
+    st.markdown("""
+    <div class="card-title">
+        📈 Shortfall Trends
+    </div>
+    <div class="card-description">
+        Item status and shortfall over the course of the event
+    </div>
+    """, unsafe_allow_html=True)
+    
+    import pandas as pd
+    
+    tier = st.radio("Resolution", [name for name, _, _ in ShortfallHistory.TIERS], horizontal=True, key="trend_tier")
+    points = get_store().history_points(tier)
+    
+    if points:
+        index = [datetime.fromtimestamp(point["t"] / 1000) for point in points]
+        
+        st.markdown("**Items by Status**")
+        status_df = pd.DataFrame([point["status"] for point in points], index=index)
+        status_df.columns = [column.title() for column in status_df.columns]
+        st.line_chart(status_df)
+        
+        st.markdown("**Quantities**")
+        totals_df = pd.DataFrame([point["totals"] for point in points], index=index)
+        totals_df.columns = [column.title() for column in totals_df.columns]
+        st.line_chart(totals_df)
+        
+        st.markdown("**Outstanding Shortfall by Location**")
+        location_df = pd.DataFrame([point["location"] for point in points], index=index).fillna(0)
+        if not location_df.empty and len(location_df.columns):
+            st.line_chart(location_df)
+        else:
+            st.info("No outstanding shortfall recorded.")
+    else:
+        st.info("No history recorded yet.")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
 def main():
     """Main application exactly matching React app structure"""
+    init_session_state()
     render_header()
     
     # Main tabs exactly matching React app
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "➕ Request Items",
         "📦 Inventory Tracking", 
         "⚙️ Admin Panel",
-        "⏰ Pending Requests"
+        "⏰ Pending Requests",
+        "📈 Trends"
     ])
     
     with tab1:
@@ -795,6 +983,7 @@ def main():
                     st.error("❌ Invalid password")
         else:
             render_inventory_table()
+            render_grouped_views()
     
     with tab3:
         render_admin_panel()
@@ -813,6 +1002,12 @@ def main():
         else:
             render_pending_requests()
     
+    with tab5:
+        if st.session_state.password_required and not st.session_state.authenticated:
+            st.warning("🔐 Authentication required for trend history")
+        else:
+            render_trends()
+    
     # Footer exactly matching React app
     st.markdown("""
     <div class="footer">
@@ -827,4 +1022,4 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
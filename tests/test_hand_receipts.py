@@ -0,0 +1,76 @@
+import io
+import zipfile
+
+import pytest
+
+import hand_receipts
+from hand_receipts import POOL_THRESHOLD, build_hand_receipts, group_by_custodian, receipt_filename, render_receipt
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    hand_receipts._cache.clear()
+    yield
+    hand_receipts._cache.clear()
+
+
+def item(custodian, name="Radio", **fields):
+    return {"itemName": name, "requested": 2, "received": 2, "missing": 0, "custodian": custodian, **fields}
+
+
+def pages(data: bytes):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name).decode() for name in archive.namelist()}
+
+
+def test_group_by_custodian():
+    groups = group_by_custodian({
+        "a": item("SSgt Johnson"),
+        "b": item("  "),
+        "c": item("SSgt Johnson", "Helmet"),
+        "d": item(""),
+    })
+    assert sorted(groups) == ["SSgt Johnson", "Unassigned"]
+    assert [entry["itemName"] for entry in groups["SSgt Johnson"]] == ["Radio", "Helmet"]
+    assert len(groups["Unassigned"]) == 2
+
+
+def test_receipt_escapes_html():
+    page = render_receipt("<b>Eve</b>", [item("<b>Eve</b>", "Cable & <Adapter>", email="eve@example.com")],
+                          "Ops & <Drill>", "2026-10-19 12:00")
+    assert "<b>Eve</b>" not in page
+    assert "&lt;b&gt;Eve&lt;/b&gt;" in page
+    assert "Cable &amp; &lt;Adapter&gt;" in page
+    assert "Ops &amp; &lt;Drill&gt;" in page
+
+
+def test_filenames_are_unique():
+    taken = set()
+    names = [receipt_filename(name, taken) for name in ["A. Smith", "A  Smith", "A/Smith", "***"]]
+    assert names == ["A_Smith.html", "A_Smith_2.html", "A_Smith_3.html", "custodian.html"]
+
+
+@pytest.mark.parametrize("custodians", [3, POOL_THRESHOLD + 5], ids=["inline", "pool"])
+def test_one_receipt_per_custodian(custodians):
+    items = {f"item_{n}": item(f"Custodian {n}") for n in range(custodians)}
+    progress = []
+    data = build_hand_receipts(items, "Exercise", version=1, progress=lambda done, total: progress.append((done, total)),
+                               workers=2)
+    receipts = pages(data)
+    assert len(receipts) == custodians
+    assert "Custodian 0" in receipts["Custodian_0.html"]
+    assert progress[-1] == (custodians, custodians)
+
+
+def test_cached_by_version_and_event_name():
+    items = {"a": item("SSgt Johnson")}
+    first = build_hand_receipts(items, "Exercise", version=1)
+    changed = {"a": item("SSgt Johnson", "Helmet")}
+    # Same version and event: the cached zip comes back even though items differ
+    assert build_hand_receipts(changed, "Exercise", version=1) is first
+    assert "Helmet" in pages(build_hand_receipts(changed, "Exercise", version=2))["SSgt_Johnson.html"]
+    assert "Exercise 2" in pages(build_hand_receipts(items, "Exercise 2", version=1))["SSgt_Johnson.html"]
+    for version in range(3, 3 + hand_receipts.CACHE_SIZE):
+        build_hand_receipts(items, "Exercise", version=version)
+    assert (1, "Exercise") not in hand_receipts._cache
+    assert len(hand_receipts._cache) == hand_receipts.CACHE_SIZE
@@ -0,0 +1,131 @@
+import http.client
+import json
+import socket
+from http import HTTPStatus
+
+import pytest
+
+from inventory_api import InventoryApi, start_api_thread
+from inventory_core import SAMPLE_INVENTORY, InventoryStore
+
+
+@pytest.fixture
+def api():
+    return InventoryApi(InventoryStore(SAMPLE_INVENTORY))
+
+
+def call(api, method, target, body=None, headers=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    return api.dispatch(method, target, headers or {}, data)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_list_and_pagination(api):
+    status, body = call(api, "GET", "/items?offset=1&limit=1")
+    assert status == HTTPStatus.OK
+    assert body["total"] == 3 and [item["id"] for item in body["items"]] == ["item2"]
+    status, body = call(api, "GET", "/items?status=missing")
+    assert {item["id"] for item in body["items"]} == {"item1", "item2"}
+
+
+@pytest.mark.parametrize("target", ["/items?status=lost", "/items?offset=-1", "/items?limit=-5", "/items?limit=x"])
+def test_bad_list_queries(api, target):
+    assert call(api, "GET", target)[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_status_mapping(api):
+    assert call(api, "GET", "/items/nope")[0] == HTTPStatus.NOT_FOUND
+    assert call(api, "GET", "/nowhere")[0] == HTTPStatus.NOT_FOUND
+    # item3 is already assigned
+    assert call(api, "POST", "/items/item3/assign")[0] == HTTPStatus.CONFLICT
+    assert call(api, "POST", "/items", {"items": [{"itemName": ""}]})[0] == HTTPStatus.BAD_REQUEST
+    assert call(api, "POST", "/requests", {"itemName": "Cot"})[0] == HTTPStatus.BAD_REQUEST
+    assert api.dispatch("POST", "/items", {}, b"[1]")[0] == HTTPStatus.BAD_REQUEST
+    assert api.dispatch("POST", "/items", {}, b"{not json")[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_token_required():
+    api = InventoryApi(InventoryStore(SAMPLE_INVENTORY), token="secret")
+    assert call(api, "GET", "/items")[0] == HTTPStatus.UNAUTHORIZED
+    assert call(api, "GET", "/items", headers={"authorization": "Bearer secret"})[0] == HTTPStatus.OK
+
+
+@pytest.mark.parametrize("raw", [b'{"dueDate": NaN}', b'{"dueDate": Infinity}', b'{"dueDate": "2026-10-20"}'])
+def test_non_finite_due_date_rejected(api, raw):
+    call(api, "POST", "/items/item1/receive", {"received": 5})
+    assert api.dispatch("POST", "/items/item1/assign", {}, raw)[0] == HTTPStatus.BAD_REQUEST
+    assert api.dispatch("POST", "/items", {}, b'{"items": [{"id": "item3", "dueDate": NaN}]}')[0] == HTTPStatus.BAD_REQUEST
+    assert "dueDate" not in api.store.get_item("item1")
+    assert api.store.get_item("item3").get("dueDate") is None
+
+
+def test_batch_reports_per_operation(api):
+    status, body = call(api, "POST", "/batch", {"operations": [
+        {"op": "receive", "id": "item1", "received": 5},
+        {"op": "assign", "id": "item1", "dueDate": 1_000},
+        {"op": "return", "id": "item2"},
+        {"op": "receive", "id": "nope", "received": 1},
+        {"op": "explode"},
+        1,
+    ]})
+    assert status == HTTPStatus.OK
+    results = body["results"]
+    assert [result["ok"] for result in results] == [True, True, False, False, False, False]
+    assert results[1]["result"]["dueDate"] == 1_000
+    assert results[3]["error"] == "Not found: nope"
+    assert results[5]["error"] == "Each operation must be a JSON object"
+
+
+@pytest.mark.parametrize("operations", ["ab", {"op": "return"}, 5])
+def test_batch_operations_must_be_a_list(api, operations):
+    assert call(api, "POST", "/batch", {"operations": operations})[0] == HTTPStatus.BAD_REQUEST
+
+
+def test_keep_alive_round_trip():
+    port = free_port()
+    store = InventoryStore(SAMPLE_INVENTORY)
+    start_api_thread(store, "127.0.0.1", port)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        # Several requests, including failing ones, share one connection
+        for method, path, body, expected in [
+            ("GET", "/items?limit=2", None, HTTPStatus.OK),
+            ("POST", "/batch", {"operations": [1]}, HTTPStatus.OK),
+            ("POST", "/items/item2/receive", {"received": 3}, HTTPStatus.OK),
+            ("GET", "/items/nope", None, HTTPStatus.NOT_FOUND),
+        ]:
+            connection.request(method, path, body=json.dumps(body) if body is not None else None)
+            response = connection.getresponse()
+            assert response.status == expected
+            assert response.getheader("Connection") == "keep-alive"
+            json.loads(response.read())
+    finally:
+        connection.close()
+    assert store.get_item("item2")["received"] == 3
+
+
+def test_unexpected_error_answers_500():
+    port = free_port()
+    store = InventoryStore(SAMPLE_INVENTORY)
+
+    def broken(key):
+        raise RuntimeError("bug")
+
+    store.get_item = broken
+    start_api_thread(store, "127.0.0.1", port)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", "/items/item1")
+        response = connection.getresponse()
+        assert response.status == HTTPStatus.INTERNAL_SERVER_ERROR
+        response.read()
+        # The connection is still usable afterwards
+        connection.request("GET", "/items?limit=1")
+        assert connection.getresponse().status == HTTPStatus.OK
+    finally:
+        connection.close()
@@ -0,0 +1,102 @@
+import copy
+
+import pytest
+
+from inventory_core import SAMPLE_INVENTORY, GROUP_FIELDS, InventoryError, InventoryStore, build_group_indexes
+
+
+def store_state(store: InventoryStore):
+    """Everything a failed write must leave untouched"""
+    return (
+        copy.deepcopy(store.items),
+        dict(store.item_versions),
+        {field: (copy.deepcopy(index.members), copy.deepcopy(index.totals)) for field, index in store.groups.items()},
+        dict(store.scheduler._due),
+        set(store.scheduler.overdue),
+    )
+
+
+@pytest.fixture
+def store():
+    store = InventoryStore(SAMPLE_INVENTORY)
+    store.receive("item1", 5)
+    store.assign("item1", 1_000)
+    return store
+
+
+def test_failed_write_leaves_store_unchanged(store):
+    before = store_state(store)
+    with pytest.raises(InventoryError):
+        # The first row is written before the second one fails
+        store.upsert_items([
+            {"id": "item1", "location": "Moved", "returned": True},
+            {"itemName": ""},
+        ])
+    assert store_state(store) == before
+    assert store.undo_stack[-1].label.startswith("Assign")
+
+
+def test_bad_item_leaves_indexes_unchanged(store):
+    before = store_state(store)
+    with pytest.raises(TypeError):
+        store._cache_item("item1", {**store.items["item1"], "location": "Elsewhere", "requested": "5"})
+    assert store_state(store) == before
+
+
+def test_rejected_fields_are_not_stored(store):
+    before = store_state(store)
+    with pytest.raises(InventoryError):
+        store.upsert_items([{"id": "item1", "requested": "5"}])
+    with pytest.raises(InventoryError):
+        store.assign("item2", "2026-10-20")
+    assert store_state(store) == before
+
+
+def test_group_indexes_match_rebuild(store):
+    store.upsert_items([{"id": "item1", "location": "Comm Center", "received": 5}])
+    store.delete_item("item2")
+    store.add_item({"itemName": "Tent", "requested": 2, "expendable": True})
+    rebuilt = build_group_indexes(store.items)
+    for field in GROUP_FIELDS:
+        assert store.groups[field].members == rebuilt[field].members
+        assert store.groups[field].totals == rebuilt[field].totals
+
+
+def test_undo_redo_round_trip(store):
+    before = store.snapshot()
+    store.delete_item("item2")
+    assert store.recent_changes(1)[0].label == "Delete Field Radio (item2)"
+    assert store.undo() == "Delete Field Radio (item2)"
+    assert dict(store.snapshot()) == dict(before)
+    assert store.redo() == "Delete Field Radio (item2)"
+    assert "item2" not in store.items
+
+
+def test_undo_refused_after_concurrent_change(tmp_path):
+    from inventory_sync import open_replica_store
+
+    db_path = str(tmp_path / "inventory.db")
+    first = open_replica_store(db_path, seed=SAMPLE_INVENTORY)
+    second = open_replica_store(db_path)
+    first.receive("item2", 3)
+    # Another replica changes the same item; this replica's undo must not overwrite it
+    second.upsert_items([{"id": "item2", "location": "Motor Pool"}])
+    with pytest.raises(InventoryError, match="item2 has changed"):
+        first.undo()
+    assert first.get_item("item2")["location"] == "Motor Pool"
+    assert first.get_item("item2")["received"] == 3
+    assert first.recent_changes(1)[0].label == "Receive Field Radio (item2)"
+
+
+def test_items_as_of(store, monkeypatch):
+    start = int(store.timeline[-1][0]) + 1_000
+    clock = iter(range(start, start + 10_000, 100))
+    monkeypatch.setattr("inventory_core.now_ms", lambda: next(clock))
+    store.receive("item2", 3)
+    received_at = store.timeline[-1][0]
+    store.delete_item("item2")
+    deleted_at = store.timeline[-1][0]
+    assert store.items_as_of(received_at)["item2"]["received"] == 3
+    assert store.items_as_of(deleted_at - 1)["item2"]["received"] == 3
+    assert "item2" not in store.items_as_of(deleted_at)
+    assert store.items_as_of(store.timeline[0][0] - 1) is None
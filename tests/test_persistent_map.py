@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from inventory_core import PersistentMap
+
+
+class Key:
+    """Key with a chosen hash, to force partial and full hash collisions"""
+
+    def __init__(self, name: str, hash_value: int):
+        self.name = name
+        self.hash_value = hash_value
+
+    def __hash__(self):
+        return self.hash_value
+
+    def __eq__(self, other):
+        return isinstance(other, Key) and other.name == self.name
+
+    def __repr__(self):
+        return f"Key({self.name!r}, {self.hash_value:#x})"
+
+
+def colliding_keys(count: int):
+    hashes = [
+        0,                # full collisions with each other
+        32,               # same first 5 bits as 0
+        1 << 59,          # differs from 0 only deep in the trie
+        (1 << 63) - 1,    # largest positive hash
+        -1,
+    ]
+    return [Key(f"k{n}", hashes[n % len(hashes)]) for n in range(count)]
+
+
+@pytest.mark.parametrize("keys", [
+    [f"item_{n}" for n in range(300)],
+    list(range(300)),
+    colliding_keys(40),
+], ids=["strings", "ints", "collisions"])
+def test_random_set_delete_matches_dict(keys):
+    rng = random.Random(33)
+    expected = {}
+    current = PersistentMap()
+    versions = []
+    for step in range(3000):
+        key = rng.choice(keys)
+        if rng.random() < 0.6:
+            current = current.set(key, step)
+            expected[key] = step
+        else:
+            current = current.delete(key)
+            expected.pop(key, None)
+        versions.append((current, dict(expected)))
+        assert len(current) == len(expected)
+    assert dict(current.items()) == expected
+    for key in keys:
+        assert (key in current) == (key in expected)
+        assert current.get(key) == expected.get(key)
+    # Older versions are unaffected by later changes
+    for version, contents in versions[::100]:
+        assert dict(version) == contents
+        assert sorted(map(repr, version.values())) == sorted(map(repr, contents.values()))
+
+
+def test_from_dict_and_delete_missing():
+    items = {f"item_{n}": n for n in range(100)}
+    trie = PersistentMap.from_dict(items)
+    assert dict(trie) == items
+    assert trie.delete("absent") is trie
+    with pytest.raises(KeyError):
+        trie["absent"]
+    emptied = trie
+    for key in items:
+        emptied = emptied.delete(key)
+    assert len(emptied) == 0 and list(emptied) == []
+    assert dict(trie) == items
@@ -0,0 +1,72 @@
+from inventory_core import SAMPLE_INVENTORY, InventoryStore, ReturnDeadlineScheduler, build_return_scheduler
+
+
+def test_check_moves_passed_deadlines():
+    scheduler = ReturnDeadlineScheduler()
+    scheduler.schedule("a", 100)
+    scheduler.schedule("b", 200)
+    assert scheduler.check(50) == set()
+    assert scheduler.check(150) == {"a"}
+    assert scheduler.check(250) == {"a", "b"}
+
+
+def test_reschedule_after_overdue_leaves_overdue_set():
+    scheduler = ReturnDeadlineScheduler()
+    scheduler.schedule("a", 100)
+    assert scheduler.check(150) == {"a"}
+    scheduler.schedule("a", 300)
+    assert scheduler.check(150) == set()
+    assert scheduler.next_due() == 300
+    assert scheduler.check(300) == {"a"}
+
+
+def test_cancel_then_schedule_same_due_time():
+    scheduler = ReturnDeadlineScheduler()
+    scheduler.schedule("a", 100)
+    scheduler.cancel("a")
+    assert scheduler.next_due() is None
+    scheduler.schedule("a", 100)
+    assert scheduler.next_due() == 100
+    assert scheduler.check(100) == {"a"}
+    scheduler.cancel("a")
+    assert scheduler.check(1_000) == set()
+
+
+def test_next_due_skips_stale_entries():
+    scheduler = ReturnDeadlineScheduler()
+    scheduler.schedule("a", 100)
+    scheduler.schedule("b", 200)
+    scheduler.schedule("a", 500)   # the 100 entry is now stale
+    assert scheduler.next_due() == 200
+    scheduler.cancel("b")
+    assert scheduler.next_due() == 500
+    # Rescheduling to the same time adds no duplicate entry
+    scheduler.schedule("a", 500)
+    assert scheduler._heap == [(500, "a")]
+
+
+def test_store_overdue_through_undo_and_redo():
+    store = InventoryStore(SAMPLE_INVENTORY)
+    store.receive("item1", 5)
+    store.assign("item1", 1_000)
+    assert list(store.overdue(2_000)) == ["item1"]
+    store.undo()
+    assert store.overdue(2_000) == {}
+    assert store.next_return_due(0) is None
+    store.redo()
+    assert list(store.overdue(2_000)) == ["item1"]
+    store.mark_returned("item1")
+    assert store.overdue(2_000) == {}
+
+
+def test_scheduler_rebuilt_after_reload(tmp_path):
+    from inventory_sync import open_replica_store
+
+    db_path = str(tmp_path / "inventory.db")
+    first = open_replica_store(db_path, seed=SAMPLE_INVENTORY)
+    second = open_replica_store(db_path)
+    first.receive("item1", 5)
+    first.assign("item1", 1_000)
+    second.apply_changes({"all": True})
+    assert list(second.overdue(2_000)) == ["item1"]
+    assert second.scheduler._due == build_return_scheduler(first.items)._due
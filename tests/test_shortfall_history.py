@@ -0,0 +1,58 @@
+from inventory_core import SAMPLE_INVENTORY, InventoryStore, ShortfallHistory, compute_aggregates
+from inventory_sync import SqliteBackend
+
+
+class SmallHistory(ShortfallHistory):
+    TIERS = (("Minute", 60_000, 3), ("Hour", 3_600_000, 2))
+
+
+def test_latest_snapshot_replaces_its_bucket():
+    history = SmallHistory()
+    history.record(60_000, {"n": 1})
+    history.record(90_000, {"n": 2})
+    history.record(120_000, {"n": 3})
+    assert history.points("Minute") == [{"t": 60_000, "n": 2}, {"t": 120_000, "n": 3}]
+    assert history.points("Hour") == [{"t": 0, "n": 3}]
+
+
+def test_tiers_are_bounded_rings():
+    history = SmallHistory()
+    for minute in range(10):
+        history.record(minute * 60_000, {"n": minute})
+    assert [point["n"] for point in history.points("Minute")] == [7, 8, 9]
+    for hour in range(1, 4):
+        history.record(hour * 3_600_000, {"n": hour})
+    assert [point["t"] for point in history.points("Hour")] == [7_200_000, 10_800_000]
+
+
+def test_one_snapshot_per_interval_bucket():
+    history = ShortfallHistory()
+    assert history.is_due(60_500)
+    history.record(60_500, {})
+    assert not history.is_due(119_999)
+    assert history.is_due(120_000)
+
+
+def test_backend_trims_each_tier(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "inventory.db"))
+    history = SmallHistory(backend)
+    with backend.transaction():
+        for minute in range(5):
+            history.record(minute * 60_000, {"n": minute})
+        history.record(4 * 60_000 + 30_000, {"n": 40})
+    assert [(point["t"], point["n"]) for point in history.points("Minute")] == [
+        (120_000, 2), (180_000, 3), (240_000, 40)
+    ]
+    assert history.points("Hour") == [{"t": 0, "n": 40}]
+    # A second process on the same file sees the same points
+    assert SmallHistory(SqliteBackend(str(tmp_path / "inventory.db"))).points("Minute") == history.points("Minute")
+
+
+def test_store_records_aggregates():
+    store = InventoryStore(SAMPLE_INVENTORY)
+    store.record_snapshot(60_000)
+    store.receive("item2", 3)
+    store.record_snapshot(61_000)   # same minute: skipped
+    points = store.history_points("Minute")
+    assert len(points) == 1
+    assert points[0]["status"] == compute_aggregates(SAMPLE_INVENTORY)["status"]